@@ -1,13 +1,27 @@
+import gzip
+import hashlib
+import importlib.resources
+import json
 import logging
+import os
+import pickle
+import sys
+from typing import Any, Optional
+
+import Utils
 
 from .DataValidation import DataValidation, ValidationError
-from .Helpers import load_data_file as helpers_load_data_file
+from .Helpers import load_data_file as helpers_load_data_file, data_bundle_name, load_data_table_csv, \
+    csv_bool, csv_int_or_bool, csv_list, csv_dict, csv_requires, HookRegistry, is_data_bundle_outdated
 
 from .hooks.Data import \
     after_load_game_file, \
     after_load_item_file, after_load_location_file, \
     after_load_region_file, after_load_category_file, \
     after_load_option_file, after_load_meta_file
+from .hooks import Data as data_hooks_module
+
+data_hooks = HookRegistry(data_hooks_module)
 
 # blatantly copied from the minecraft ap world because why not
 def load_data_file(*args) -> dict:
@@ -19,6 +33,17 @@ def convert_to_list(data, property_name: str) -> list:
         data = data.get(property_name, [])
     return data
 
+# Types of the known columns of items.csv/tsv and locations.csv/tsv, other columns are guessed from their value
+item_csv_columns = {
+    "name": str, "id": int, "count": int, "category": csv_list, "value": csv_dict,
+    "progression": csv_bool, "progression_skip_balancing": csv_bool, "useful": csv_bool, "trap": csv_bool, "filler": csv_bool,
+    "early": csv_int_or_bool, "local_early": csv_int_or_bool, "local": csv_bool,
+}
+location_csv_columns = {
+    "name": str, "id": int, "region": str, "category": csv_list, "requires": csv_requires, "victory": csv_bool,
+    "place_item": csv_list, "place_item_category": csv_list, "dont_place_item": csv_list, "dont_place_item_category": csv_list,
+}
+
 class ManualFile:
     filename: str
     data_type: dict|list
@@ -36,51 +61,223 @@ class ManualFile:
         return contents
 
 
-game_table = ManualFile('game.json', dict).load() #dict
-item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
-location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
-region_table = ManualFile('regions.json', dict).load() #dict
-category_table = ManualFile('categories.json', dict).load() #dict
-option_table = ManualFile('options.json', dict).load() #dict
-meta_table = ManualFile('meta.json', dict).load() #dict
+class DataCache:
+    """First-run cache of processed data (ids, lookups, groups) stored in the user folder.\n
+    The cache is keyed by a hash of the data folder, the hooks and the core modules processing the data,
+    so any change to them rebuilds it.\n
+    A cache hit skips the after_load_* hook of the cached table, so a cache given a hook_name is only used
+    while that hook is left as in the template (returning its table unchanged), a changed hook could have side effects.
+    """
+    version: int = 4
+    """Bump this when the format of what's cached changes"""
+    source_files = ["Data.py", "DataValidation.py", "Game.py", "Helpers.py", "Items.py", "Locations.py"]
+    _key: Optional[str] = None
+
+    def __init__(self, name: str, hook_name: Optional[str] = None):
+        self.name = name
+        self.hook_name = hook_name
+        self.path = Utils.user_path("cache", "manual", f"{__package__.split('.')[-1]}_{name}.pickle")
+
+    @classmethod
+    def get_key(cls) -> str:
+        if cls._key is None:
+            package_files = importlib.resources.files(__package__)
+            hasher = hashlib.sha256(f"{cls.version}-{sys.version_info[:2]}".encode())
+
+            def hash_folder(folder, skip_json: bool = False):
+                for entry in sorted(folder.iterdir(), key=lambda e: e.name):
+                    if entry.is_dir():
+                        if entry.name != "__pycache__":
+                            hash_folder(entry, skip_json)
+                    elif not entry.name.endswith(".pyc") and not (skip_json and entry.name.endswith(".json")):
+                        hasher.update(entry.name.encode())
+                        hasher.update(entry.read_bytes())
+
+            bundle = package_files.joinpath("data", data_bundle_name)
+            if bundle.is_file() and not is_data_bundle_outdated():
+                # The bundle replaces the json files, the csv/tsv files are still loaded on their own
+                hash_folder(package_files.joinpath("data"), skip_json=True)
+            elif package_files.joinpath("data").is_dir():
+                hash_folder(package_files.joinpath("data"))
+            if package_files.joinpath("hooks").is_dir():
+                hash_folder(package_files.joinpath("hooks"))
+            for filename in cls.source_files:
+                hasher.update(package_files.joinpath(filename).read_bytes())
+            cls._key = hasher.hexdigest()
+        return cls._key
+
+    @property
+    def enabled(self) -> bool:
+        return self.hook_name is None or not data_hooks.is_active(self.hook_name)
+
+    def load(self) -> Optional[dict[str, Any]]:
+        """Return the cached data if it exists and is still valid for the current data files, otherwise None"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("key") == self.get_key():
+                return cached["data"]
+        except Exception:
+            pass
+        return None
+
+    def save(self, data: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump({"key": self.get_key(), "data": data}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path) # Atomic so parallel generations never read a half written cache
+        except Exception as e:
+            logging.debug(f"Manual: Could not save the {self.name} data cache to {self.path}: {e}")
+
+def build_data_bundle() -> str:
+    """Pack every json file of the data folder into data/bundle.json.gz and return its path.\n
+    When present the bundle is loaded instead of the individual files, so rebuild (or delete) it after editing the data.
+    While the apworld is a folder, json files edited after the bundle was built are loaded instead of it, with a warning.\n
+    Run from your Archipelago folder with: python -c "from worlds.<your apworld folder>.Data import build_data_bundle; print(build_data_bundle())"
+    """
+    data_folder = os.path.join(os.path.dirname(__file__), "data")
+    files = {}
+    for root, _, filenames in os.walk(data_folder):
+        for filename in sorted(filenames):
+            if filename.endswith(".json"):
+                path = os.path.join(root, filename)
+                with open(path, "r", encoding="utf-8") as f:
+                    files[os.path.relpath(path, data_folder).replace(os.sep, "/")] = json.load(f)
+
+    bundle_path = os.path.join(data_folder, data_bundle_name)
+    with open(bundle_path, "wb") as f:
+        f.write(gzip.compress(json.dumps({"files": files}, separators=(",", ":")).encode(), mtime=0))
+    return bundle_path
 
-# Removal of schemas in root of tables
-region_table.pop('$schema', '')
-category_table.pop('$schema', '')
+validation_cache = DataCache("validation")
+_validation_cached: Optional[bool] = None
 
-# hooks
-game_table = after_load_game_file(game_table)
-item_table = after_load_item_file(item_table)
-location_table = after_load_location_file(location_table)
-region_table = after_load_region_file(region_table)
-category_table = after_load_category_file(category_table)
-option_table = after_load_option_file(option_table)
-meta_table = after_load_meta_file(meta_table)
+def is_validation_cached() -> bool:
+    """Whether these exact data files and hooks already passed every validation, so it can be skipped.\n
+    Always False when DataValidation.force_validation is set."""
+    global _validation_cached
+    if DataValidation.force_validation:
+        return False
+    if _validation_cached is None:
+        _validation_cached = validation_cache.load() is not None
+    return _validation_cached
 
-# seed all of the tables for validation
-DataValidation.game_table = game_table
-DataValidation.item_table = item_table
-DataValidation.location_table = location_table
-DataValidation.region_table = region_table
+def is_table_loaded(name: str) -> bool:
+    """Whether the named table was already loaded from its file (or restored from a DataCache)"""
+    return name in globals()
 
-validation_errors = []
+def restore_table(name: str, table) -> None:
+    """Use an already processed table (from a DataCache) instead of loading and hooking its file again"""
+    globals()[name] = table
+    if hasattr(DataValidation, name):
+        setattr(DataValidation, name, table)
 
-# check that json files are not just invalid json
-try: DataValidation.checkForGameBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
 
-try: DataValidation.checkForItemsBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
+def _load_game_table() -> dict:
+    game_table = after_load_game_file(ManualFile('game.json', dict).load())
+    DataValidation.game_table = game_table
+    _validate_json(DataValidation.checkForGameBeingInvalidJSON)
+    return game_table
 
-try: DataValidation.checkForLocationsBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
+def _load_item_table() -> list:
+    item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') or load_data_table_csv('items', item_csv_columns)
+    item_table = after_load_item_file(item_table)
+    DataValidation.item_table = item_table
+    _validate_json(DataValidation.checkForItemsBeingInvalidJSON)
+    return item_table
+
+def _load_location_table() -> list:
+    location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') or load_data_table_csv('locations', location_csv_columns)
+    location_table = after_load_location_file(location_table)
+    DataValidation.location_table = location_table
+    _validate_json(DataValidation.checkForLocationsBeingInvalidJSON)
+    return location_table
+
+def _load_region_table() -> dict:
+    region_table = ManualFile('regions.json', dict).load()
+    region_table.pop('$schema', '') # Removal of schemas in root of tables
+    region_table = after_load_region_file(region_table)
+    DataValidation.region_table = region_table
+    return region_table
+
+def _load_category_table() -> dict:
+    category_table = ManualFile('categories.json', dict).load()
+    category_table.pop('$schema', '')
+    return after_load_category_file(category_table)
+
+def _load_option_table() -> dict:
+    return after_load_option_file(ManualFile('options.json', dict).load())
+
+def _load_meta_table() -> dict:
+    return after_load_meta_file(ManualFile('meta.json', dict).load())
+
+_table_loaders = {  # In the order the tables (and their after_load_* hooks) were loaded when they were all loaded at import
+    'game_table': _load_game_table, #dict
+    'item_table': _load_item_table, #list
+    'location_table': _load_location_table, #list
+    'region_table': _load_region_table, #dict
+    'category_table': _load_category_table, #dict
+    'option_table': _load_option_table, #dict
+    'meta_table': _load_meta_table, #dict
+}
+
+_tables_loading: set[str] = set()
+
+def __getattr__(name: str):
+    """Load a data table the first time it is accessed instead of loading every file at import.\n
+    The game table is always loaded (and hooked) first since the other hooks may rely on it.
+    Every table before this one whose after_load_* hook isn't left as in the template is also loaded first,
+    so the hooks that do something always run in the same order no matter which table is accessed first.
+    """
+    if name not in _table_loaders:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    for earlier_name in _table_loaders:
+        if earlier_name == name:
+            break
+        if earlier_name not in globals() and earlier_name not in _tables_loading \
+                and (earlier_name == 'game_table' or data_hooks.is_active(f"after_load_{earlier_name.removesuffix('_table')}_file")):
+            __getattr__(earlier_name)
+    if name in globals():
+        return globals()[name] # Loaded by the hook of an earlier table
+
+    _tables_loading.add(name) # Its hook may access a later table, which must not load this one again
+    try:
+        table = _table_loaders[name]()
+    finally:
+        _tables_loading.discard(name)
+    globals()[name] = table # Once loaded the table is a regular module attribute and this isn't called again for it
+    return table
 
 
 ############
 # If there are any validation errors, display all of them at once
 ############
 
-if len(validation_errors) > 0:
-    logging.error("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
-    print("\n\nYou can close this window.\n")
-    keeping_terminal_open = input("If you are running from a terminal, press Ctrl-C followed by ENTER to break execution.")
+_json_validation_errors: list[ValidationError] = []
+_json_validation_errors_reported: int = 0
+
+def _validate_json(check) -> None:
+    if is_validation_cached():
+        return
+    try: check()
+    except ValidationError as e: _json_validation_errors.append(e)
+
+def report_json_validation_errors() -> bool:
+    """Display the ValidationErrors found while loading the tables that weren't displayed yet, all at once.\n
+    Called once the world is imported (every table with a json check is loaded by then) and again before generation.
+    Return whether any table failed its json check."""
+    global _json_validation_errors_reported
+    validation_errors = _json_validation_errors[_json_validation_errors_reported:]
+    if validation_errors:
+        _json_validation_errors_reported = len(_json_validation_errors)
+        logging.error("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+        print("\n\nYou can close this window.\n")
+        keeping_terminal_open = input("If you are running from a terminal, press Ctrl-C followed by ENTER to break execution.")
+    return len(_json_validation_errors) > 0
@@ -1,8 +1,12 @@
 import logging
+import math
+import os
 import re
 import json
+from collections import Counter
+from typing import Optional
 from worlds.AutoWorld import World
-from BaseClasses import MultiWorld, ItemClassification
+from BaseClasses import MultiWorld, CollectionState
 
 
 class ValidationError(Exception):
@@ -13,10 +17,32 @@ class DataValidation():
     item_table = []
     location_table = []
     region_table = {}
+    force_validation: bool = bool(os.environ.get("MANUAL_FORCE_VALIDATION"))
+    """Validate even if these exact data files and hooks already passed, set the MANUAL_FORCE_VALIDATION environment variable to enable it"""
+    _index: Optional[dict[str, set[str]]] = None
+    """The index of the runGenerationDataValidation in progress"""
 
+    @staticmethod
+    def buildIndex() -> dict[str, set[str]]:
+        return {
+            "item_names": {item["name"] for item in DataValidation.item_table},
+            "item_categories": {category for item in DataValidation.item_table for category in item.get("category", [])},
+            "region_names": set(DataValidation.region_table),
+        }
+
+    @staticmethod
+    def getIndex() -> dict[str, set[str]]:
+        """Return the sets of item names, item categories and region names that the checks look things up in.\n
+        runGenerationDataValidation builds them once from the tables as they are when it starts, so its checks share them
+        instead of scanning the whole table for every lookup. A check called on its own builds them from the current tables."""
+        if DataValidation._index is not None:
+            return DataValidation._index
+        return DataValidation.buildIndex()
 
     @staticmethod
     def checkItemNamesInLocationRequires():
+        index = DataValidation.getIndex()
+
         for location in DataValidation.location_table:
             if "requires" not in location:
                 continue
@@ -37,7 +63,7 @@ class DataValidation():
                                 item_name = item_parts[0]
 
                             item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
+                            item_category_exists = item_name in index["item_categories"]
 
                             if not item_category_exists:
                                 raise ValidationError("Item category %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
@@ -52,7 +78,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in index["item_names"]
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
@@ -73,7 +99,7 @@ class DataValidation():
                             if len(or_item_parts) > 1:
                                 or_item_name = or_item_parts[0]
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
+                            item_exists = or_item_name in index["item_names"]
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
@@ -84,13 +110,14 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in index["item_names"]
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
 
     @staticmethod
     def checkItemNamesInRegionRequires():
+        index = DataValidation.getIndex()
         for region_name in DataValidation.region_table:
             region = DataValidation.region_table[region_name]
 
@@ -113,7 +140,7 @@ class DataValidation():
                                 item_name = item_parts[0]
 
                             item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
+                            item_category_exists = item_name in index["item_categories"]
 
                             if not item_category_exists:
                                 raise ValidationError("Item category %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -128,7 +155,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in index["item_names"]
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -149,7 +176,7 @@ class DataValidation():
                             if len(or_item_parts) > 1:
                                 or_item_name = or_item_parts[0]
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
+                            item_exists = or_item_name in index["item_names"]
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
@@ -160,24 +187,63 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in index["item_names"]
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
 
     @staticmethod
     def checkRegionNamesInLocations():
+        region_names = DataValidation.getIndex()["region_names"]
         for location in DataValidation.location_table:
             if "region" not in location or location["region"] in ["Menu", "Manual"]:
                 continue
 
-            region_exists = len([name for name in DataValidation.region_table if name == location["region"]]) > 0
+            region_exists = location["region"] in region_names
 
             if not region_exists:
                 raise ValidationError("Region %s is set for location %s, but the region is misspelled or does not exist." % (location["region"], location["name"]))
 
+    @staticmethod
+    def _getRequiresTokens(requires) -> list[str]:
+        """Return every item/category token of a requires, with its |pipes| if it's in string form"""
+        if isinstance(requires, str):
+            return re.findall(r'\|[^|]+\|', requires)
+
+        tokens = [] # item access is in dict form
+        for item in requires:
+            if isinstance(item, dict) and isinstance(item.get("or"), list):
+                tokens.extend(item["or"])
+            elif isinstance(item, list):
+                tokens.extend(item)
+            else:
+                tokens.append(item)
+        return tokens
+
+    @staticmethod
+    def _getRequiresItemNames(requires) -> list[str]:
+        """Return the names of the items (not the categories) a requires references"""
+        item_names = []
+        for token in DataValidation._getRequiresTokens(requires):
+            if isinstance(token, str) and not token.startswith(("@", "|@")):
+                item_names.append(token.strip("|").split(":")[0])
+        return item_names
+
     @staticmethod
     def checkItemsThatShouldBeRequired():
+        # Which location and region first requires each item, so every requires only gets read once
+        required_by_location: dict[str, str] = {}
+        for location in DataValidation.location_table:
+            if "requires" in location:
+                for item_name in DataValidation._getRequiresItemNames(location["requires"]):
+                    required_by_location.setdefault(item_name, location["name"])
+
+        required_by_region: dict[str, str] = {}
+        for region_name, region in DataValidation.region_table.items():
+            if "requires" in region:
+                for item_name in DataValidation._getRequiresItemNames(region["requires"]):
+                    required_by_region.setdefault(item_name, region_name)
+
         for item in DataValidation.item_table:
             # if the item is already progression, no need to check
             if "progression" in item and item["progression"]:
@@ -187,39 +253,11 @@ class DataValidation():
             if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
                 continue
 
-            # check location requires for the presence of item name
-            for location in DataValidation.location_table:
-                if "requires" not in location:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
-
-                # if boolean, else legacy
-                if isinstance(location_requires, str):
-                    if '|{}|'.format(item["name"]) in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-                else:
-                    if item["name"] in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-
-            # check region requires for the presence of item name
-            for region_name in DataValidation.region_table:
-                region = DataValidation.region_table[region_name]
+            if item["name"] in required_by_location:
+                raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], required_by_location[item["name"]]))
 
-                if "requires" not in region:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
-
-                # if boolean, else legacy
-                if isinstance(region_requires, str):
-                    if '|{}|'.format(item["name"]) in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
-                else:
-                    if item["name"] in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
+            if item["name"] in required_by_region:
+                raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], required_by_region[item["name"]]))
 
     @staticmethod
     def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
@@ -236,7 +274,7 @@ class DataValidation():
 
     @staticmethod
     def preFillCheckIfEnoughItemsForValue(world: World, multiworld: MultiWorld):
-        from .Helpers import get_items_with_value, get_items_for_player, filter_used_regions
+        from .Helpers import get_item_value_tables, make_item_value_tables, filter_used_regions
         player = world.player
         values_requested = {}
         player_regions = []
@@ -273,23 +311,111 @@ class DataValidation():
         # compare whats available vs requested but only if there's anything requested
         if values_requested:
             errors = []
-            existing_items = [item for item in get_items_for_player(multiworld, player, True) if
-                              item.code is not None and ItemClassification.progression in item.classification]
+            value_tables = get_item_value_tables(multiworld, player) or make_item_value_tables(multiworld, player)
             for value, val_count in values_requested.items():
-                items_value = get_items_with_value(world, multiworld, value, player)
-                found_count = 0
-                if items_value:
-                    for item in existing_items:
-                        if item.name in items_value:
-                            found_count += items_value[item.name]
+                found_count = value_tables.progression_totals.get(value, 0)
 
                 if found_count < val_count:
                     errors.append(f"   '{value}': {found_count} out of the {val_count} {value} worth of progression items required can be found.")
             if errors:
                 raise ValidationError("There are not enough progression items for the following value(s): \n" + "\n".join(errors))
 
+    @staticmethod
+    def _getBlockingRequireTokens(world: World, state: CollectionState, requires) -> list[str]:
+        """Return the item/category tokens of a requires that the given state does not satisfy.
+        Functions can't be evaluated out of context, so they are only reported when no item token is blocking.
+        """
+        from .Helpers import has_category
+        if not requires:
+            return []
+
+        tokens = DataValidation._getRequiresTokens(requires)
+        items_counts = world.get_item_counts(only_progression=True)
+        blocking = []
+        for token in tokens:
+            item = token.strip('|')
+            is_category = item.startswith('@')
+            item_parts = item.lstrip('@').split(":")
+            item_name = item_parts[0].strip()
+            item_count = item_parts[1].strip().lower() if len(item_parts) > 1 else "1"
+
+            if is_category:
+                item_names = [i["name"] for i in world.item_name_to_item.values() if has_category(i, item_name)]
+            else:
+                item_names = [item_name]
+
+            real_count = sum(items_counts.get(name, 0) for name in item_names)
+            if item_count == 'all':
+                required = real_count
+            elif item_count == 'half':
+                required = int(real_count / 2)
+            elif item_count.endswith('%') and len(item_count) > 1:
+                required = math.ceil(real_count * min(max(float(item_count[:-1]) / 100, 0), 1))
+            elif item_count.isnumeric():
+                required = int(item_count)
+            else:
+                continue
+
+            if sum(state.count(name, world.player) for name in item_names) < required:
+                blocking.append(token if token.startswith('|') else f"|{token}|")
+
+        if not blocking and isinstance(requires, str):
+            blocking.extend(re.findall(r'\{\w+\(.*?\)\}', requires))
+
+        return blocking
+
+    @staticmethod
+    def preFillCheckForUnreachableLocations(world: World, multiworld: MultiWorld):
+        """Collect every item of the player then sweep the player's events until nothing changes.
+        Anything still unreachable at that point can never be reached, no matter how fill places the items.
+        """
+        from .Helpers import get_items_for_player
+        player = world.player
+
+        state = CollectionState(multiworld)
+        for item in get_items_for_player(multiworld, player):
+            if item.code is not None and item.advancement:
+                state.collect(item, True)
+
+        events = [location for location in multiworld.get_locations(player)
+                  if location.item is not None and location.item.code is None and location.item.player == player]
+        collected_events = set()
+        found_new_event = True
+        while found_new_event:
+            found_new_event = False
+            for location in events:
+                if location.name not in collected_events and location.can_reach(state):
+                    state.collect(location.item, True, location)
+                    collected_events.add(location.name)
+                    found_new_event = True
+
+        unreachable = [location for location in multiworld.get_locations(player) if not location.can_reach(state)]
+        if not unreachable:
+            return
+
+        errors = []
+        for location in unreachable:
+            blocking = []
+            region = location.parent_region
+            if not region.can_reach(state):
+                blocking.extend(DataValidation._getBlockingRequireTokens(world, state, DataValidation.region_table.get(region.name, {}).get("requires")))
+                if not blocking:
+                    blocking.append(f"region '{region.name}' is unreachable")
+
+            blocking.extend(DataValidation._getBlockingRequireTokens(world, state, world.location_name_to_location.get(location.name, {}).get("requires")))
+            errors.append(f"   '{location.name}' in region '{region.name}': blocked by {', '.join(blocking) if blocking else 'an unknown requirement'}")
+
+        message = "The following location(s) cannot be reached even with every progression item collected: \n" + "\n".join(errors)
+        accessibility = getattr(world.options, "accessibility", None)
+        if multiworld.completion_condition[player](state) and accessibility is not None and accessibility.value == accessibility.option_minimal:
+            logging.warning(f"{world.game}: {message}")
+            return
+
+        raise ValidationError(message)
+
     @staticmethod
     def checkRegionsConnectingToOtherRegions():
+        region_names = DataValidation.getIndex()["region_names"]
         for region_name in DataValidation.region_table:
             region = DataValidation.region_table[region_name]
 
@@ -297,23 +423,25 @@ class DataValidation():
                 continue
 
             for connecting_region in region["connects_to"]:
-                region_exists = len([name for name in DataValidation.region_table if name == connecting_region]) > 0
+                region_exists = connecting_region in region_names
 
                 if not region_exists:
                     raise ValidationError("Region %s connects to a region %s, which is misspelled or does not exist." % (region_name, connecting_region))
 
     @staticmethod
     def checkForDuplicateItemNames():
+        name_counts = Counter(item["name"] for item in DataValidation.item_table)
         for item in DataValidation.item_table:
-            name_count = len([i for i in DataValidation.item_table if i["name"] == item["name"]])
+            name_count = name_counts[item["name"]]
 
             if name_count > 1:
                 raise ValidationError("Item %s is defined more than once." % (item["name"]))
 
     @staticmethod
     def checkForDuplicateLocationNames():
+        name_counts = Counter(location["name"] for location in DataValidation.location_table)
         for location in DataValidation.location_table:
-            name_count = len([l for l in DataValidation.location_table if l["name"] == location["name"]])
+            name_count = name_counts[location["name"]]
 
             if name_count > 1:
                 raise ValidationError("Location %s is defined more than once." % (location["name"]))
@@ -321,8 +449,9 @@ class DataValidation():
     @staticmethod
     def checkForDuplicateRegionNames():
         # this currently does nothing because the region name is a dict key, which will never be non-unique / limited to 1
+        name_counts = Counter(region_name for region_name in DataValidation.region_table)
         for region_name in DataValidation.region_table:
-            name_count = len([r for r in DataValidation.region_table if r == region_name])
+            name_count = name_counts[region_name]
 
             if name_count > 1:
                 raise ValidationError("Region %s is defined more than once." % (region_name))
@@ -333,6 +462,7 @@ class DataValidation():
             return
 
         starting_items = DataValidation.game_table["starting_items"]
+        index = DataValidation.getIndex()
 
         for starting_block in starting_items:
             if "items" in starting_block and "item_categories" in starting_block:
@@ -340,12 +470,12 @@ class DataValidation():
 
             if "items" in starting_block:
                 for item_name in starting_block["items"]:
-                    if not item_name in [item["name"] for item in DataValidation.item_table]:
+                    if not item_name in index["item_names"]:
                         raise ValidationError("Item %s is set as a starting item, but is misspelled or is not defined." % (item_name))
 
             if "item_categories" in starting_block:
                 for category_name in starting_block["item_categories"]:
-                    if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                    if category_name not in index["item_categories"]:
                         raise ValidationError("Item category %s is set as a starting item category, but is misspelled or is not defined on any items." % (category_name))
 
     @staticmethod
@@ -380,6 +510,7 @@ class DataValidation():
 
     @staticmethod
     def checkPlacedItemsForValidItems():
+        item_names = DataValidation.getIndex()["item_names"]
         for location in DataValidation.location_table:
             if not (place_item := location.get("place_item", False)):
                 continue
@@ -389,11 +520,12 @@ class DataValidation():
                 continue
 
             for item_name in place_item:
-                if not item_name in [item["name"] for item in DataValidation.item_table]:
+                if not item_name in item_names:
                     raise ValidationError("Item %s is placed (using place_item) on a location, but is misspelled or is not defined." % (item_name))
 
     @staticmethod
     def checkPlacedItemCategoriesForValidItemCategories():
+        item_categories = DataValidation.getIndex()["item_categories"]
         for location in DataValidation.location_table:
             if not (place_item_category := location.get("place_item_category", False)):
                 continue
@@ -403,7 +535,7 @@ class DataValidation():
                 continue
 
             for category_name in place_item_category:
-                if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                if category_name not in item_categories:
                     raise ValidationError("Item category %s is placed (using place_item_category) on a location, but is misspelled or is not defined." % (category_name))
 
     @staticmethod
@@ -429,11 +561,10 @@ class DataValidation():
             return
 
         nonstarting_regions = [region for region in DataValidation.region_table if not DataValidation.region_table[region].get("starting")]
+        connected_to_regions = {connected for region in DataValidation.region_table.values() for connected in region.get("connects_to", [])}
 
         for nonstarter in nonstarting_regions:
-            regions_that_connect_to = [region for region in DataValidation.region_table if "connects_to" in DataValidation.region_table[region] and nonstarter in DataValidation.region_table[region]["connects_to"]]
-
-            if len(regions_that_connect_to) == 0:
+            if nonstarter not in connected_to_regions:
                 raise ValidationError("The region '%s' is set as a non-starting region, but has no regions that connect to it. It will be inaccessible." % nonstarter)
 
 
@@ -444,14 +575,27 @@ def runPreFillDataValidation(world: World, multiworld: MultiWorld):
     try: DataValidation.preFillCheckIfEnoughItemsForValue(world, multiworld)
     except ValidationError as e: validation_errors.append(e)
 
+    # check that every location can be reached once the player has every item, before fill spends time trying
+    if world.prefill_reachability_check:
+        try: DataValidation.preFillCheckForUnreachableLocations(world, multiworld)
+        except ValidationError as e: validation_errors.append(e)
+
     if validation_errors:
         heading = f"ValidationError(s) for pre_fill of {world.game}:";
         newline = "\n"
         raise Exception(f"\n\n{heading} \n\n{newline.join([' - ' + str(validation_error) for validation_error in validation_errors])}\n\n")
 
 # Called during stage_assert_generate
-def runGenerationDataValidation(cls) -> None:
+def runGenerationDataValidation(cls, use_cache: bool = True) -> None:
+    """Validate the data tables, skipped if these exact data files and hooks already passed.\n
+    use_cache=False neither skips nor records the result, for tables that don't come from the data files."""
+    from .Data import region_table, is_validation_cached, validation_cache, report_json_validation_errors # the data tables are loaded on first access, make sure the ones validated here are
+    json_errors = report_json_validation_errors()
+    if use_cache and is_validation_cached():
+        return
+
     validation_errors = []
+    DataValidation._index = DataValidation.buildIndex() # Hooks can edit the tables in place, so it's never kept between runs
 
     # check that requires have correct item names in locations and regions
     try: DataValidation.checkItemNamesInLocationRequires()
@@ -505,7 +649,12 @@ def runGenerationDataValidation(cls) -> None:
     try: DataValidation.checkForNonStartingRegionsThatAreUnreachable()
     except ValidationError as e: validation_errors.append(e)
 
+    DataValidation._index = None
+
     if len(validation_errors) > 0:
         heading = f"ValidationError(s) in {cls.game}:";
 
         raise Exception("\n\n%s \n\n%s\n\n" % (heading, "\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+
+    if use_cache and not json_errors:
+        validation_cache.save({"passed": True})
@@ -1,27 +1,71 @@
 import ast
 import csv
+import dis
+import gzip
+import hashlib
+import inspect
+import io
+import logging
 import os
 import pkgutil
 import json
+import sys
+from collections import Counter, OrderedDict, deque
 
-from BaseClasses import MultiWorld, Item
+from BaseClasses import MultiWorld, Item, Location
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
-from types import GenericAlias
+from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any, Callable, Hashable, Iterable, Iterator, Mapping
+from types import GenericAlias, MappingProxyType, ModuleType
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
 
 if TYPE_CHECKING:
+    from random import Random
     from .Items import ManualItem
     from .Locations import ManualLocation
 
+data_bundle_name = "bundle.json.gz"
+_data_bundle: Optional[dict[str, Any]] = None
+
+def load_data_bundle() -> dict[str, Any]:
+    """Return the json files packed in data/bundle.json.gz (see Data.build_data_bundle) by their path in the data folder.\n
+    The bundle is read and decompressed once, if there's none every file is read on its own instead."""
+    global _data_bundle
+    if _data_bundle is None and is_data_bundle_outdated():
+        logging.warning(f"{__package__}: Some json files of the data folder were edited after data/{data_bundle_name} was built, "
+                        "they're loaded instead of it. Rebuild it (see Data.build_data_bundle) or delete it.")
+        _data_bundle = {}
+    if _data_bundle is None:
+        try:
+            bundle = json.loads(gzip.decompress(pkgutil.get_data(__name__, f"data/{data_bundle_name}")).decode())
+            _data_bundle = bundle.get("files", {})
+        except OSError: # No bundle, which is the norm while making a manual
+            _data_bundle = {}
+    return _data_bundle
+
+def is_data_bundle_outdated() -> bool:
+    """Whether a json file of the data folder is newer than data/bundle.json.gz, only possible while the apworld is a folder."""
+    data_folder = os.path.join(os.path.dirname(__file__), "data")
+    bundle_path = os.path.join(data_folder, data_bundle_name)
+    if not os.path.isfile(bundle_path):
+        return False
+    bundle_time = os.path.getmtime(bundle_path)
+    for root, _, filenames in os.walk(data_folder):
+        if any(filename.endswith(".json") and os.path.getmtime(os.path.join(root, filename)) > bundle_time for filename in filenames):
+            return True
+    return False
+
 # blatantly copied from the minecraft ap world because why not
 def load_data_file(*args) -> dict:
+    bundle = load_data_bundle()
+    if "/".join(args) in bundle:
+        return bundle["/".join(args)]
+
     fname = "/".join(["data", *args])
 
     try:
         filedata = json.loads(pkgutil.get_data(__name__, fname).decode())
-    except:
+    except OSError: # Optional files like options.json can be missing, invalid json should still be reported
         filedata = []
 
     return filedata
@@ -37,6 +81,208 @@ def load_data_csv(*args) -> list[dict]:
 
     return filedata
 
+######################
+# Typed csv/tsv columns
+######################
+
+def csv_bool(value: str) -> bool:
+    return value.strip().lower() in ("true", "1", "yes", "y", "x")
+
+def csv_int_or_bool(value: str) -> Union[int, bool]:
+    """For columns like early that take either a count or true/false"""
+    return int(value) if value.strip().isnumeric() else csv_bool(value)
+
+def csv_list(value: str) -> list:
+    """A json list or comma separated values"""
+    if value.lstrip().startswith("["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass # like "[Some Name], other", comma separated after all
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+def csv_dict(value: str) -> dict:
+    """A json object or comma separated key:number pairs, ex: 'coins:5, gems:2'"""
+    if value.lstrip().startswith("{"):
+        return json.loads(value)
+    pairs = (pair.split(":", 1) for pair in value.split(",") if pair.strip())
+    return {k.strip(): int(v) for k, v in pairs}
+
+def csv_requires(value: str) -> Union[str, list, dict]:
+    """A requires string as is, or a json list/object of requires"""
+    if value.lstrip().startswith(("[", "{")):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass # requires strings can start with a {function()} or a [region]
+    return value
+
+def csv_guess(value: str) -> Any:
+    """Used for columns without a known type, like the ones only your hooks use"""
+    stripped = value.strip()
+    if stripped.lower() in ("true", "false"):
+        return stripped.lower() == "true"
+    if stripped.lstrip("-").isnumeric():
+        return int(stripped)
+    if stripped.startswith(("[", "{")):
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            pass
+    return value
+
+def parse_data_csv(lines: Iterable[str], columns: dict[str, Callable[[str], Any]], delimiter: str = ",", source: str = "csv") -> Iterator[dict[str, Any]]:
+    """Parse csv rows one at a time into the same dicts as the matching json file would give.\n
+    Each cell is converted by its column's function in columns (csv_guess if it has none).
+    Empty cells are left out so they get the same defaults as a missing json key, columns starting with '_' are comments."""
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    converters = [(index, name.strip(), columns.get(name.strip(), csv_guess))
+                  for index, name in enumerate(header) if name.strip() and not name.strip().startswith("_")]
+    for row in reader:
+        try:
+            entry = {name: row[index] if convert is str else convert(row[index])
+                     for index, name, convert in converters if index < len(row) and row[index] != ""}
+        except ValueError as e:
+            raise ValueError(f"{source} line {reader.line_num}: {e}") from e
+        if entry:
+            yield entry
+
+def load_data_table_csv(name: str, columns: dict[str, Callable[[str], Any]]) -> list[dict[str, Any]]:
+    """Load data/<name>.csv, or data/<name>.tsv if tab separated, row by row. Returns an empty list if there's neither"""
+    for extension, delimiter in (("csv", ","), ("tsv", "\t")):
+        fname = f"data/{name}.{extension}"
+        try:
+            data = pkgutil.get_data(__name__, fname)
+        except OSError:
+            continue
+        return list(parse_data_csv(io.StringIO(data.decode("utf-8-sig"), newline=""), columns, delimiter, fname))
+    return []
+
+######################
+# Category bitsets
+######################
+
+category_bits: dict[str, int] = {}
+"""The bit of each category of the items and locations, assigned in the order they are first seen"""
+
+def get_category_bit(category: str) -> int:
+    bit = category_bits.get(category)
+    if bit is None:
+        bit = category_bits[category] = 1 << len(category_bits)
+    return bit
+
+def get_categories_mask(categories: Iterable[str]) -> int:
+    """Combine the bits of categories into one mask, to compare with an item/location's get_category_mask"""
+    mask = 0
+    for category in categories:
+        mask |= get_category_bit(category)
+    return mask
+
+def get_category_mask(obj: Mapping[str, Any]) -> int:
+    """Return the categories of an item/location as a bitmask, it's precomputed for the records and computed for plain dicts"""
+    mask = getattr(obj, "category_mask", None)
+    if mask is None:
+        mask = get_categories_mask(obj.get("category", []))
+    return mask
+
+def has_category(obj: Mapping[str, Any], category: str) -> bool:
+    """Check if an item/location is in category"""
+    bit = category_bits.get(category)
+    return bit is not None and get_category_mask(obj) & bit != 0
+
+def has_any_category(obj: Mapping[str, Any], categories: Union[Iterable[str], int]) -> bool:
+    """Check if an item/location is in any of categories, which can also be a mask from get_categories_mask"""
+    mask = categories if isinstance(categories, int) else get_categories_mask(categories)
+    return get_category_mask(obj) & mask != 0
+
+def get_disabled_categories_mask(multiworld: MultiWorld, player: int) -> int:
+    """Return the mask of every known category disabled for player (by a yaml option or the before_is_category_enabled hook)"""
+    cache = get_category_enabled_cache(multiworld, player)
+    if cache.disabled_mask_size != len(category_bits): # Recompute if categories were added since, like by a hook's item
+        mask = 0
+        for category, bit in category_bits.items():
+            if not is_category_enabled(multiworld, player, category):
+                mask |= bit
+        cache.disabled_mask = mask
+        cache.disabled_mask_size = len(category_bits)
+    return cache.disabled_mask
+
+######################
+# Item and location records
+######################
+
+_missing = object()
+
+class DataRecord(Mapping):
+    """Read only, slotted form of an item or location once its table is processed.\n
+    It acts like the dict it was made from (record["name"], record.get("category"), "requires" in record...)
+    but the known keys are stored in slots instead of a dict each, with repeated strings interned and the categories in a tuple.
+    Keys without a slot (like the ones only hooks use) are kept in a small dict.
+    The records are shared by every player, so they can't be changed, do it in the after_load_*_file hooks instead."""
+    __slots__ = ("_extra", "category_mask")
+    fields: tuple[str, ...] = ()
+    interned_fields: tuple[str, ...] = ()
+    """Fields whose strings repeat a lot across the table, the categories always are"""
+
+    def __init__(self, data: Mapping[str, Any]):
+        set_slot = object.__setattr__
+        for field in self.fields:
+            value = data.get(field, _missing)
+            if field == "category" and value is not _missing:
+                value = tuple(sys.intern(c) if isinstance(c, str) else c for c in value)
+            elif field in self.interned_fields and isinstance(value, str):
+                value = sys.intern(value)
+            set_slot(self, field, value)
+        extra = {k: v for k, v in data.items() if k not in self.fields}
+        set_slot(self, "_extra", extra or None)
+        set_slot(self, "category_mask", get_categories_mask(self.get("category", ())))
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, _missing) if key in self.fields else _missing
+        if value is _missing:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, _missing) if key in self.fields else _missing
+        if value is _missing:
+            return default if self._extra is None else self._extra.get(key, default)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.fields:
+            return getattr(self, key) is not _missing # type: ignore
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.fields:
+            if getattr(self, field) is not _missing:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __setitem__(self, key: str, value: Any):
+        raise TypeError(f"{type(self).__name__} '{self.get('name')}' can't be changed since it is shared by every player, "
+                        f"modify it in the after_load_*_file hooks instead")
+
+    def __setattr__(self, key: str, value: Any):
+        self.__setitem__(key, value)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
 def is_option_enabled(multiworld: MultiWorld, player: int, name: str) -> bool:
     return get_option_value(multiworld, player, name) > 0
 
@@ -56,15 +302,61 @@ def clamp(value, min, max):
     else:
         return value
 
+class CategoryEnabledCache:
+    """Per player results of is_category_enabled and before_is_category_enabled.\n
+    A category's status can't change once the options are final, so each category only needs to go through the hook
+    and its yaml_option once. If the options do change (like in interpret_slot_data) use reset_category_enabled_cache."""
+    def __init__(self):
+        self.enabled: dict[str, bool] = {}
+        self.hook_results: dict[str, Optional[bool]] = {}
+        self.disabled_mask: int = 0
+        self.disabled_mask_size: int = -1
+        self.hook_calls_avoided: int = 0
+
+def get_category_enabled_cache(multiworld: MultiWorld, player: int) -> CategoryEnabledCache:
+    world = multiworld.worlds[player]
+    cache = getattr(world, 'category_enabled_cache', None)
+    if cache is None:
+        cache = world.category_enabled_cache = CategoryEnabledCache()
+    return cache
+
+def reset_category_enabled_cache(world: World):
+    """Forget which categories are enabled for the world's player, use it after changing its options"""
+    cache = getattr(world, 'category_enabled_cache', None)
+    if cache is None or (not cache.enabled and not cache.hook_results and cache.disabled_mask_size < 0):
+        return # Nothing cached yet (or not a Manual world), like when a hook resets it before any category was checked
+    cache.enabled.clear()
+    cache.hook_results.clear()
+    cache.disabled_mask = 0
+    cache.disabled_mask_size = -1
+
+def get_category_hook_result(multiworld: MultiWorld, player: int, category_name: str) -> Optional[bool]:
+    """Return what before_is_category_enabled returns for category_name, it's only called once per player and category"""
+    cache = get_category_enabled_cache(multiworld, player)
+    if category_name in cache.hook_results:
+        cache.hook_calls_avoided += 1
+        return cache.hook_results[category_name]
+
+    hook_result = cache.hook_results[category_name] = before_is_category_enabled(multiworld, player, category_name)
+    return hook_result
+
 def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
-    from .Data import category_table
     """Check if a category has been disabled by a yaml option."""
-    hook_result = before_is_category_enabled(multiworld, player, category_name)
+    cache = get_category_enabled_cache(multiworld, player)
+    enabled = cache.enabled.get(category_name)
+    if enabled is not None:
+        cache.hook_calls_avoided += 1
+        return enabled
+
+    hook_result = get_category_hook_result(multiworld, player, category_name)
     if hook_result is not None:
-        return hook_result
+        enabled = hook_result
+    else:
+        from .Data import category_table
+        enabled = resolve_yaml_option(multiworld, player, category_table.get(category_name, {}))
 
-    category_data = category_table.get(category_name, {})
-    return resolve_yaml_option(multiworld, player, category_data)
+    cache.enabled[category_name] = enabled
+    return enabled
 
 def resolve_yaml_option(multiworld: MultiWorld, player: int, data: dict) -> bool:
     if "yaml_option" in data:
@@ -115,63 +407,207 @@ def _is_manualobject_enabled(multiworld: MultiWorld, player: int, object: Any) -
     """Internal method: Check if a Manual Object has any category disabled by a yaml option.
     \nPlease use the proper is_'item/location'_enabled or is_'item/location'_name_enabled methods instead.
     """
-    enabled = True
-    for category in object.get("category", []):
-        if not is_category_enabled(multiworld, player, category):
-            enabled = False
-            break
-
-    return enabled
+    disabled_mask = get_disabled_categories_mask(multiworld, player)
+    return get_category_mask(object) & disabled_mask == 0
+
+class PlayerItemIndex:
+    """The items of a player that are in the multiworld (in the item pool or placed on a location) and their counts by name.\n
+    It is built by create_items so get_items_for_player doesn't have to go through the items of every player.
+    Placing an item from the pool only moves it to a location so it doesn't change the index,
+    but if a hook adds, removes or places a new item (like an event) for the player after create_items
+    and reads the player's items again before pre_fill, use reset_player_item_index (or invalidate_player_item_index).
+    stage_pre_fill rebuilds the indexes that don't match the multiworld's items anymore, like after start_inventory_from_pool or item links.\n
+    The counts only include items with an id, not events."""
+    def __init__(self, items: Iterable[Item] = ()):
+        self.items: list[Item] = []
+        self.precollected_count: int = 0
+        """How many starting items the player had when the ItemValueTables were built from this index, they count them too"""
+        self.counts: Counter[str] = Counter()
+        self.progression_counts: Counter[str] = Counter()
+        self.add(items)
+
+    def add(self, items: Iterable[Item]):
+        for item in items:
+            self.items.append(item)
+            if item.code is not None:
+                self.counts[item.name] += 1
+                if item.advancement:
+                    self.progression_counts[item.name] += 1
+
+    def remove(self, items: Iterable[Item]):
+        for item in items:
+            self.items.remove(item)
+            if item.code is not None:
+                self.counts[item.name] -= 1
+                if item.advancement:
+                    self.progression_counts[item.name] -= 1
+
+class ItemCounts:
+    """How many of each item there is, for all of them and for the progression ones only.\n
+    Kept up to date by adding and removing the items as they are created or taken out instead of counting everything again."""
+    def __init__(self, items: Iterable[Item] = ()):
+        self.all: Counter[str] = Counter()
+        self.progression: Counter[str] = Counter()
+        self.add(items)
+
+    def add(self, items: Iterable[Item]):
+        for item in items:
+            self.all[item.name] += 1
+            if item.advancement:
+                self.progression[item.name] += 1
+
+    def remove(self, items: Iterable[Item]):
+        for item in items:
+            self._decrement(self.all, item.name)
+            if item.advancement:
+                self._decrement(self.progression, item.name)
+
+    @staticmethod
+    def _decrement(counts: Counter[str], name: str):
+        if counts[name] <= 1:
+            del counts[name] # So the names are only the ones still there, like a fresh count
+        else:
+            counts[name] -= 1
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ItemCounts) and self.all == other.all and self.progression == other.progression
+
+def get_player_item_index(multiworld: MultiWorld, player: int) -> Optional[PlayerItemIndex]:
+    """Return the player's PlayerItemIndex, None if the player's items weren't created yet or it's not a Manual game"""
+    world = multiworld.worlds.get(player)
+    if getattr(world, 'player_item_index_stale', False):
+        reset_player_item_index(world)
+    return getattr(world, 'player_item_index', None)
+
+def set_player_item_index(world: World, items: Iterable[Item]):
+    """Index these items as the world's player's items and build its ItemValueTables from them and its starting items"""
+    world.player_item_index_stale = False
+    world.player_item_index = PlayerItemIndex(items)
+    world.player_item_index.precollected_count = len(world.multiworld.precollected_items.get(world.player, ()))
+    world.item_value_tables = make_item_value_tables(world.multiworld, world.player)
+
+def reset_player_item_index(world: World):
+    """Rebuild the world's PlayerItemIndex from every item of the multiworld and its ItemValueTables from that,
+    use it after adding or removing some of the player's items"""
+    set_player_item_index(world, (i for i in world.multiworld.get_items() if i.player == world.player))
+
+def refresh_player_item_indexes(multiworld: MultiWorld, worlds: Iterable[World]):
+    """Rebuild the PlayerItemIndex and ItemValueTables of the worlds whose items or starting items changed since they were built.\n
+    Every item of the multiworld is gone through once for all of these worlds, instead of once per world like reset_player_item_index."""
+    worlds = {world.player: world for world in worlds if getattr(world, 'player_item_index', None) is not None}
+    if not worlds:
+        return
+    items: dict[int, list[Item]] = {player: [] for player in worlds}
+    for item in multiworld.get_items():
+        if item.player in items:
+            items[item.player].append(item)
+    for player, world in worlds.items():
+        index = world.player_item_index
+        if getattr(world, 'player_item_index_stale', False) \
+                or index.precollected_count != len(multiworld.precollected_items.get(player, ())) \
+                or len(index.items) != len(items[player]) or {id(i) for i in index.items} != {id(i) for i in items[player]}:
+            set_player_item_index(world, items[player])
+
+def invalidate_player_item_index(world: World):
+    """Mark the world's PlayerItemIndex and ItemValueTables as out of date, they're rebuilt the next time they're used.\n
+    Unlike reset_player_item_index, calling it again before then costs nothing. Does nothing if the index wasn't built."""
+    if getattr(world, 'player_item_index', None) is not None:
+        world.player_item_index_stale = True
 
 def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollected: bool = False) -> List[Item]:
     """Return list of items of a player including placed items"""
-    items = [i for i in multiworld.get_items() if i.player == player]
+    index = get_player_item_index(multiworld, player)
+    if index is not None:
+        items = list(index.items)
+    else:
+        items = [i for i in multiworld.get_items() if i.player == player]
     if includePrecollected:
         items.extend(multiworld.precollected_items.get(player, []))
     return items
 
-def reset_specific_item_value_cache_for_player(world: World, value: str, player: Optional[int] = None) -> dict[str, int]:
+def get_item_counts_for_player(multiworld: MultiWorld, player: int, includePrecollected: bool = False, only_progression: bool = False) -> Counter[str]:
+    """Return how many of each item the player has in the multiworld (events excluded), including placed items.\n
+    The only_progression argument let you filter the items to only count progression items."""
+    index = get_player_item_index(multiworld, player)
+    if index is None:
+        items = get_items_for_player(multiworld, player, includePrecollected)
+        return Counter(i.name for i in items if i.code is not None and (not only_progression or i.advancement))
+
+    counts = +(index.progression_counts if only_progression else index.counts) # + drops the names with no item left and copies it
+    if includePrecollected:
+        counts.update(i.name for i in multiworld.precollected_items.get(player, []) if i.code is not None and (not only_progression or i.advancement))
+    return counts
+
+class ItemValueTables:
+    """The ItemValue tables of a player, read-only and built once its items are created.\n
+    values: value name -> item name -> how much of that value one of the item is worth, for every item the player has\n
+    totals: value name -> how much of that value all of the player's items (starting items included) are worth\n
+    progression_totals: like totals but only counting the progression items"""
+    __slots__ = ("values", "totals", "progression_totals")
+
+    def __init__(self, counts: Counter[str], progression_counts: Counter[str], item_name_to_item: Mapping[str, Mapping]):
+        values: dict[str, dict[str, int]] = {}
+        totals: dict[str, int] = {}
+        progression_totals: dict[str, int] = {}
+        for name, count in counts.items():
+            for value, amount in item_name_to_item.get(name, {}).get("value", {}).items():
+                values.setdefault(value, {})[name] = amount
+                totals[value] = totals.get(value, 0) + int(amount) * count
+                progression_totals[value] = progression_totals.get(value, 0) + int(amount) * progression_counts[name]
+
+        self.values: Mapping[str, Mapping[str, int]] = MappingProxyType({value: MappingProxyType(items) for value, items in values.items()})
+        self.totals: Mapping[str, int] = MappingProxyType(totals)
+        self.progression_totals: Mapping[str, int] = MappingProxyType(progression_totals)
+
+def make_item_value_tables(multiworld: MultiWorld, player: int) -> ItemValueTables:
+    """Build the ItemValueTables of the player's current items, starting items included"""
+    return ItemValueTables(get_item_counts_for_player(multiworld, player, True),
+                           get_item_counts_for_player(multiworld, player, True, only_progression=True),
+                           multiworld.worlds[player].item_name_to_item)
+
+def get_item_value_tables(multiworld: MultiWorld, player: int) -> Optional[ItemValueTables]:
+    """Return the player's ItemValueTables, None if the player's items weren't created yet or it's not a Manual game"""
+    get_player_item_index(multiworld, player) # Rebuilds both if they're out of date
+    return getattr(multiworld.worlds.get(player), 'item_value_tables', None)
+
+_deprecations_warned: set[str] = set()
+
+def _warn_deprecated_once(name: str):
+    if name not in _deprecations_warned:
+        _deprecations_warned.add(name)
+        logging.warning(f"Deprecated usage of {name}, the item values are no longer cached per value. Use reset_player_item_index after changing a player's items instead")
+
+def reset_specific_item_value_cache_for_player(world: World, value: str, player: Optional[int] = None) -> Mapping[str, int]:
+    _warn_deprecated_once("reset_specific_item_value_cache_for_player")
     if player is None:
         player = world.player
-    return world.item_values[player].pop(value, {})
+    if not hasattr(world.multiworld.worlds[player], 'item_name_to_item'):
+        return _no_item_values # Not a Manual world, it has no item values
+    invalidate_player_item_index(world.multiworld.worlds[player])
+    return get_items_with_value(world, world.multiworld, value, player)
 
 def reset_item_value_cache_for_player(world: World, player: Optional[int] = None):
+    _warn_deprecated_once("reset_item_value_cache_for_player")
     if player is None:
         player = world.player
-    world.item_values[player] = {}
+    invalidate_player_item_index(world.multiworld.worlds[player])
 
-def get_items_with_value(world: World, multiworld: MultiWorld, value: str, player: Optional[int] = None, skipCache: bool = False) -> dict[str, int]:
-    """Return a dict of every items with a specific value type present in their respective 'value' dict\n
+_no_item_values: Mapping[str, int] = MappingProxyType({})
+
+def get_items_with_value(world: World, multiworld: MultiWorld, value: str, player: Optional[int] = None, skipCache: bool = False) -> Mapping[str, int]:
+    """Return a read-only dict of every items of the player with a specific value type present in their respective 'value' dict\n
     Output in the format 'Item Name': 'value count'\n
-    Keep a cache of the result, it can be skipped with 'skipCache == True'\n
-    To force a Reset of the player's cache of a value use either reset_specific_item_value_cache_for_player or reset_item_value_cache_for_player
+    It comes from the player's ItemValueTables built after create_items,
+    with 'skipCache == True' (or before the tables exist) it's computed from the player's current items instead.
     """
     if player is None:
         player = world.player
 
-    player_items = get_items_for_player(multiworld, player, True)
-    # Just a small check to prevent caching {} if items don't exist yet
-    if not player_items:
-        return {value: -1}
-
     value = value.lower().strip()
-
-    if not skipCache:
-        if not hasattr(world, 'item_values'): #Cache of just the item values
-            world.item_values = {}
-
-        if not world.item_values.get(player):
-            world.item_values[player] = {}
-
-    if value not in world.item_values.get(player, {}).keys() or skipCache:
-        item_with_values = {i.name: world.item_name_to_item[i.name]['value'].get(value, 0)
-                            for i in player_items if i.code is not None
-                            and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
-        if skipCache:
-            return item_with_values
-        world.item_values[player][value] = item_with_values
-    return world.item_values[player].get(value)
-
+    tables = get_item_value_tables(multiworld, player)
+    if tables is None or skipCache:
+        tables = make_item_value_tables(multiworld, player)
+    return tables.values.get(value, _no_item_values)
 
 def filter_used_regions(player_regions: dict|list) -> set:
     """Return a set of regions that are actually used in Generation. It includes region that have no locations but are required by other regions\n
@@ -202,6 +638,185 @@ def filter_used_regions(player_regions: dict|list) -> set:
         checkParent(region)
     return used_regions
 
+def pick_starting_items(pool: list[Item], starting_item_block: dict[str, Any], random: "Random", item_name_to_item: Mapping[str, Mapping],
+                        counts: Optional["ItemCounts"] = None) -> list[Item]:
+    """Pick the items a starting_items block of game.json gives, removing them from the pool.\n
+    The items are shuffled and removed exactly like the original one by one approach did so seeds stay the same,
+    without the list lookups and removals that made it quadratic.\n
+    If given, counts (of the pool and starting items) is kept up to date, the removed copy isn't always the one picked."""
+    # start with the full pool of items
+    items = pool
+
+    # if the setting lists specific item names, limit the items to just those
+    if "items" in starting_item_block:
+        item_names = set(starting_item_block["items"])
+        items = [item for item in pool if item.name in item_names]
+
+    # if the setting lists specific item categories, limit the items to ones that have any of those categories
+    if "item_categories" in starting_item_block:
+        categories_mask = get_categories_mask(starting_item_block["item_categories"])
+        items_in_categories = {item["name"] for item in item_name_to_item.values() if has_any_category(item, categories_mask)}
+        items = [item for item in pool if item.name in items_in_categories]
+
+    random.shuffle(items)
+
+    # if the setting lists a specific number of random items that should be pulled, only use a subset equal to that number
+    if "random" in starting_item_block:
+        items = items[0:starting_item_block["random"]]
+
+    if items is pool:
+        # Removing from the pool while going through it only picks every other item, kept as is for the seeds' sake
+        picked = []
+        removed = []
+        for starting_item in items:
+            picked.append(starting_item)
+            removed.append(pool.pop(pool.index(starting_item))) # same as pool.remove
+    else:
+        picked = items
+        removed = remove_items_from_pool(pool, items)
+
+    if counts is not None:
+        counts.add(picked)
+        counts.remove(removed)
+    return picked
+
+def remove_items_from_pool(pool: list[Item], items: Iterable[Item]) -> list[Item]:
+    """Remove items from pool in a single pass, with the same result as calling pool.remove for each of them.\n
+    Like pool.remove, each one removes the first remaining item of the pool equal to it (same name and player),
+    which can be another copy than the one given so the items actually removed are returned."""
+    pool_indices: dict[tuple[str, int], deque[int]] = {}
+    for index, item in enumerate(pool):
+        pool_indices.setdefault((item.name, item.player), deque()).append(index)
+
+    removed_indices = set()
+    for item in items:
+        indices = pool_indices.get((item.name, item.player))
+        if not indices:
+            raise ValueError(f"{item} is not in the pool")
+        removed_indices.add(indices.popleft())
+
+    removed_items = [pool[index] for index in sorted(removed_indices)]
+    pool[:] = [item for index, item in enumerate(pool) if index not in removed_indices]
+    return removed_items
+
+def get_forbidden_item_names(locations: Iterable[Mapping[str, Any]], item_name_to_item: Mapping[str, Mapping]) -> dict[str, frozenset[str]]:
+    """Return location name -> the names of the items its dont_place_item and dont_place_item_category forbid, for the locations that forbid any"""
+    items_in_categories: dict[int, frozenset[str]] = {} # Locations often forbid the same categories
+    forbidden_item_names = {}
+    for location in locations:
+        if "dont_place_item" not in location and "dont_place_item_category" not in location:
+            continue
+
+        names = set()
+        if location.get("dont_place_item"):
+            names.update(name for name in location["dont_place_item"] if name in item_name_to_item)
+
+        if location.get("dont_place_item_category"):
+            categories_mask = get_categories_mask(location["dont_place_item_category"])
+            if categories_mask not in items_in_categories:
+                items_in_categories[categories_mask] = frozenset(i["name"] for i in item_name_to_item.values() if has_any_category(i, categories_mask))
+            names.update(items_in_categories[categories_mask])
+
+        if names:
+            forbidden_item_names[location["name"]] = frozenset(names)
+    return forbidden_item_names
+
+def get_placement_candidates(locations: Iterable[Mapping[str, Any]], item_name_to_item: Mapping[str, Mapping]) -> dict[str, tuple[frozenset[str], str]]:
+    """Return location name -> (the names of the items its place_item and place_item_category allow minus the ones its
+    dont_place_item and dont_place_item_category forbid, the error to raise if none are in the pool) for the locations with placements"""
+    candidates = {}
+    for location in locations:
+        if "place_item" not in location and "place_item_category" not in location:
+            continue
+
+        eligible_item_names = []
+        forbidden_item_names = []
+        place_messages = []
+        forbid_messages = []
+
+        #First we get possible items names
+        if location.get("place_item"):
+            eligible_item_names += location["place_item"]
+            place_messages.append('", "'.join(location["place_item"]))
+
+        if location.get("place_item_category"):
+            categories_mask = get_categories_mask(location["place_item_category"])
+            eligible_item_names += [i["name"] for i in item_name_to_item.values() if has_any_category(i, categories_mask)]
+            place_messages.append('", "'.join(location["place_item_category"]) + " category(ies)")
+
+        # Second we check for forbidden items names
+        if location.get("dont_place_item"):
+            forbidden_item_names += location["dont_place_item"]
+            forbid_messages.append('", "'.join(location["dont_place_item"]) + ' items')
+
+        if location.get("dont_place_item_category"):
+            categories_mask = get_categories_mask(location["dont_place_item_category"])
+            forbidden_item_names += [i["name"] for i in item_name_to_item.values() if has_any_category(i, categories_mask)]
+            forbid_messages.append('", "'.join(location["dont_place_item_category"]) + ' category(ies)')
+
+        nl = "\n"
+        if forbidden_item_names:
+            error = f'Could not find a suitable item to place at "{location["name"]}".\n    No items that match "{f"{nl}     or ".join(place_messages)}"\n    Maybe because of forbidden "{f"{nl}     or ".join(forbid_messages)}"'
+        else:
+            error = f'Could not find a suitable item to place at "{location["name"]}". \n    No items that match "{f"{nl}     or ".join(place_messages)}"'
+
+        candidates[location["name"]] = (frozenset(eligible_item_names).difference(forbidden_item_names), error)
+    return candidates
+
+def get_category_item_names(item_name_to_item: Mapping[str, Mapping]) -> dict[str, tuple[str, ...]]:
+    """Return category -> the names of its items, in item_name_to_item order"""
+    category_item_names: dict[str, list[str]] = {}
+    for name, item in item_name_to_item.items():
+        for category in dict.fromkeys(item.get("category", [])): # an item listing a category twice is still only in it once
+            category_item_names.setdefault(category, []).append(name)
+    return {category: tuple(names) for category, names in category_item_names.items()}
+
+def _hook_instructions(hook: Callable) -> Optional[tuple]:
+    """The bytecode instructions of a hook, with local variables by position so the argument names don't matter"""
+    code = getattr(hook, "__code__", None)
+    if code is None:
+        return None
+    return tuple((i.opname, i.arg if "FAST" in i.opname else i.argval) for i in dis.get_instructions(code))
+
+def _returns_first_argument(value, *args):
+    return value
+
+def is_passthrough_hook(hook: Callable) -> bool:
+    """Whether a hook only returns its first argument unchanged, like the default before_create_item and after_create_item do.\n
+    Those hooks don't need to be called, so the core can skip them when they weren't changed."""
+    instructions = _hook_instructions(hook)
+    return instructions is not None and instructions == _hook_instructions(_returns_first_argument)
+
+def _does_nothing(*args):
+    pass
+
+def is_noop_hook(hook: Callable) -> bool:
+    """Whether a hook does nothing at all, like the default after_collect_item and after_remove_item"""
+    instructions = _hook_instructions(hook)
+    return instructions is not None and instructions == _hook_instructions(_does_nothing)
+
+class HookRegistry:
+    """The hooks (before_*, after_* and hook_* functions) of a hooks module, sorted once when the world is imported.\n
+    Hooks still doing what the template's do, nothing or returning their first argument, are trivial
+    and the core skips calling them. Any other hook, or one it doesn't know about, is active and always called."""
+
+    def __init__(self, module: ModuleType):
+        self.module_name: str = module.__name__
+        self.hooks: dict[str, Callable] = {name: value for name, value in vars(module).items()
+                                           if name.startswith(("before_", "after_", "hook_"))
+                                           and inspect.isfunction(value) and value.__module__ == module.__name__}
+        self.trivial: frozenset[str] = frozenset(name for name, hook in self.hooks.items() if is_noop_hook(hook) or is_passthrough_hook(hook))
+
+    def is_active(self, name: str) -> bool:
+        return name not in self.trivial
+
+    def report(self) -> str:
+        """Which hooks are active and which are skipped, for the logs"""
+        active = [name for name in self.hooks if self.is_active(name)]
+        skipped = [name for name in self.hooks if not self.is_active(name)]
+        return f"{self.module_name}: {len(active)} active hook(s): {', '.join(active) or 'none'}; " \
+               f"{len(skipped)} skipped: {', '.join(skipped) or 'none'}"
+
 def convert_to_long_string(input: str | list[str]) -> str:
     """Verify that the input is a str. If it's a list[str] then it combine them into a str in a way that works with yaml template/website options descriptions"""
     if not isinstance(input, str):
@@ -215,6 +830,54 @@ def format_to_valid_identifier(input: str) -> str:
         input = "_" + input
     return input.replace(" ", "_")
 
+def _option_value_key(value: Any) -> Any:
+    """Turn an option value into something with the same repr whatever the order of its sets and dicts"""
+    if isinstance(value, Mapping):
+        return tuple(sorted(((repr(k), _option_value_key(v)) for k, v in value.items()), key=repr))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_option_value_key(v) for v in value), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_option_value_key(v) for v in value)
+    return value
+
+def get_options_key(world: World) -> str:
+    """A hash of the resolved values of all of a world's options, worlds with the same key have the same options"""
+    values = tuple((option_name, _option_value_key(getattr(world.options, option_name).value)) for option_name in world.options_dataclass.type_hints)
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+class OptionArtifactCache:
+    """Least recently used cache of what a world builds from its options alone, like its enabled locations and item config,
+    so players with the same options share it instead of building it again.\n
+    The artifacts are shared, whoever gets one must not change it."""
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        """How many artifacts are kept, 0 to not keep any"""
+        self.artifacts: OrderedDict[tuple[str, Hashable], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, options_key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the artifact called name for options_key, calling build to make it if it isn't cached"""
+        key = (name, options_key)
+        if key in self.artifacts:
+            self.hits += 1
+            self.artifacts.move_to_end(key)
+            return self.artifacts[key]
+
+        self.misses += 1
+        artifact = build()
+        if self.maxsize > 0:
+            self.artifacts[key] = artifact
+            if len(self.artifacts) > self.maxsize:
+                self.artifacts.popitem(last=False)
+        return artifact
+
+    def clear(self):
+        self.artifacts.clear()
+        self.hits = 0
+        self.misses = 0
+
 class ProgItemsCat(IntEnum):
     VALUE = 1
     CATEGORY = 2
@@ -232,6 +895,12 @@ def format_state_prog_items_key(category: str|ProgItemsCat ,key: str) -> str:
 
     return f"MANUAL_{cat_key}_{format_to_valid_identifier(key.lower())}"
 
+def get_item_value_deltas(item_name_to_item: Mapping[str, Mapping]) -> dict[str, tuple[tuple[str, int], ...]]:
+    """Return item name -> (state.prog_items key, amount) of each of its values, only for the items that have values.\n
+    Used by collect and remove so they don't have to format the keys and convert the amounts every time."""
+    return {name: tuple((format_state_prog_items_key(ProgItemsCat.VALUE, key), int(amount)) for key, amount in item["value"].items())
+            for name, item in item_name_to_item.items() if item.get("value")}
+
 def convert_string_to_type(input: str, target_type: type) -> Any:
     """Take a string and attempt to convert it to {target_type}
     \ntarget_type can be a single type(ex. str), an union (int|str), an Optional type (Optional[str]) or a combo of any of those (Optional[int|str])
@@ -1,66 +1,101 @@
 from BaseClasses import Item
-from .Data import item_table
+from . import Data
+from .Data import DataCache
 from .Game import filler_item_name, starting_index
+from .Helpers import DataRecord
+
+
+class ItemRecord(DataRecord):
+    __slots__ = fields = ("name", "id", "count", "category", "value", "progression", "progression_skip_balancing",
+                          "useful", "trap", "filler", "early", "local", "local_early")
 
 
 ######################
 # Generate item lookups
 ######################
 
-item_id_to_name: dict[int, str] = {}
-item_name_to_item: dict[str, dict] = {}
-item_name_groups: dict[str, str] = {}
+def generate_item_lookups(item_table: list) -> dict:
+    """Assign ids to the items of item_table and build every item lookup from it"""
+    item_id_to_name: dict[int, str] = {}
+    item_name_groups: dict[str, list[str]] = {}
+    lastItemId = -1
+
+    count = starting_index
+
+    # add the filler item to the list of items for lookup
+    if filler_item_name:
+        item_table.append({
+            "name": filler_item_name
+        })
+
+    # add sequential generated ids to the lists
+    for key, val in enumerate(item_table):
+        if "id" in item_table[key]:
+            item_id = item_table[key]["id"]
+            if item_id >= count:
+                count = item_id
+            else:
+                raise ValueError(f"{item_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
+
+        item_table[key]["id"] = count
+        item_table[key]["progression"] = val["progression"] if "progression" in val else False
+        if isinstance(val.get("category", []), str):
+            item_table[key]["category"] = [val["category"]]
+
+        count += 1
+
+    for item in item_table:
+        item_name = item["name"]
+        item_id_to_name[item["id"]] = item_name
+
+        if item["id"] is not None:
+            lastItemId = max(lastItemId, item["id"])
+
+        for c in item.get("category", []):
+            if c not in item_name_groups:
+                item_name_groups[c] = []
+            item_name_groups[c].append(item_name)
+
+        #Just lowercase the values here to remove all the .lower.strip down the line
+        item['value'] = {k.lower().strip(): v
+                         for k, v in item.get('value', {}).items()}
+
+        for v in item.get("value", {}).keys():
+            group_name = f"has_{v}_value"
+            if group_name not in item_name_groups:
+                item_name_groups[group_name] = []
+            item_name_groups[group_name].append(item_name)
+
+    item_id_to_name[None] = "__Victory__"
+
+    # Done last since the records can't be changed, in place so Data.item_table gets them too
+    item_table[:] = [ItemRecord(item) for item in item_table]
+    item_name_to_item: dict[str, ItemRecord] = {item["name"]: item for item in item_table}
+
+    return {
+        "item_table": item_table,
+        "item_id_to_name": item_id_to_name,
+        "item_name_to_item": item_name_to_item,
+        "item_name_groups": item_name_groups,
+        "lastItemId": lastItemId,
+    }
+
+item_cache = DataCache("items", "after_load_item_file")
+item_lookups = item_cache.load() if not Data.is_table_loaded("item_table") else None
+
+if item_lookups is None:
+    item_lookups = generate_item_lookups(Data.item_table)
+    item_cache.save(item_lookups)
+else:
+    Data.restore_table("item_table", item_lookups["item_table"])
+
+item_table: list[ItemRecord] = item_lookups["item_table"]
+item_id_to_name: dict[int, str] = item_lookups["item_id_to_name"]
+item_name_to_item: dict[str, ItemRecord] = item_lookups["item_name_to_item"]
+item_name_groups: dict[str, list[str]] = item_lookups["item_name_groups"]
 advancement_item_names: set[str] = set()
-lastItemId = -1
-
-count = starting_index
-
-# add the filler item to the list of items for lookup
-if filler_item_name:
-    item_table.append({
-        "name": filler_item_name
-    })
-
-# add sequential generated ids to the lists
-for key, val in enumerate(item_table):
-    if "id" in item_table[key]:
-        item_id = item_table[key]["id"]
-        if item_id >= count:
-            count = item_id
-        else:
-            raise ValueError(f"{item_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
-
-    item_table[key]["id"] = count
-    item_table[key]["progression"] = val["progression"] if "progression" in val else False
-    if isinstance(val.get("category", []), str):
-        item_table[key]["category"] = [val["category"]]
-        
-    count += 1
-
-for item in item_table:
-    item_name = item["name"]
-    item_id_to_name[item["id"]] = item_name
-    item_name_to_item[item_name] = item
-
-    if item["id"] is not None:
-        lastItemId = max(lastItemId, item["id"])
-
-    for c in item.get("category", []):
-        if c not in item_name_groups:
-            item_name_groups[c] = []
-        item_name_groups[c].append(item_name)
-
-    #Just lowercase the values here to remove all the .lower.strip down the line
-    item['value'] = {k.lower().strip(): v
-                     for k, v in item.get('value', {}).items()}
-
-    for v in item.get("value", {}).keys():
-        group_name = f"has_{v}_value"
-        if group_name not in item_name_groups:
-            item_name_groups[group_name] = []
-        item_name_groups[group_name].append(item_name)
-
-item_id_to_name[None] = "__Victory__"
+lastItemId: int = item_lookups["lastItemId"]
+
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
 
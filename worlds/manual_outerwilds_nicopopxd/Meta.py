@@ -16,6 +16,20 @@ class ManualWeb(WebWorld):
         "setup/en",
         ["Fuzzy"]
     )]
+    make_option_groups: bool = False
+    """Create the option_groups from Manual's options the first time they are read"""
+
+def _get_option_groups(web: ManualWeb) -> list:
+    if web.make_option_groups and "_option_groups" not in vars(web):
+        from .Options import make_options_group
+        web._option_groups = make_options_group()
+    return vars(web).get("_option_groups", WebWorld.option_groups)
+
+def _set_option_groups(web: ManualWeb, option_groups: list):
+    web._option_groups = option_groups
+
+# Added after the class is created since WebWorld's metaclass expects option_groups to be a list, not a property
+ManualWeb.option_groups = property(_get_option_groups, _set_option_groups) # type: ignore
 
 ######################################
 # Convert meta.json data to properties
@@ -27,8 +41,7 @@ def set_world_description(base_doc: str) -> str:
     return base_doc
 
 
-def set_world_webworld(web: WebWorld) -> WebWorld:
-    from .Options import make_options_group
+def set_world_webworld(web: ManualWeb) -> ManualWeb:
     if meta_table.get("docs", {}).get("web", {}):
         Web_Config = meta_table["docs"]["web"]
 
@@ -36,7 +49,7 @@ def set_world_webworld(web: WebWorld) -> WebWorld:
         web.game_info_languages = Web_Config.get("game_info_languages", web.game_info_languages)
         web.options_presets = Web_Config.get("options_presets", web.options_presets)
         web.options_page = Web_Config.get("options_page", web.options_page)
-        web.option_groups = make_options_group()
+        web.make_option_groups = True
         if hasattr(web, 'bug_report_page'):
             web.bug_report_page = Web_Config.get("bug_report_page", web.bug_report_page)
         else:
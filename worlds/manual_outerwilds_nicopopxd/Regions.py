@@ -1,26 +1,59 @@
+from types import MappingProxyType
+from typing import Mapping
+
 from BaseClasses import Entrance, MultiWorld, Region
 from .Helpers import is_category_enabled, is_location_enabled
-from .Data import region_table
 from .Locations import ManualLocation, location_name_to_location
 from worlds.AutoWorld import World
 
 
-if not region_table:
-    region_table = {}
+def get_region_map() -> dict:
+    """Return the regions.json regions plus the Manual region, loading regions.json the first time it's needed"""
+    if "regionMap" not in globals():
+        from .Data import region_table
+
+        if not region_table:
+            region_table = {}
+
+        regionMap = { **region_table }
+        starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
+
+        if len(starting_regions) == 0:
+            starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
 
-regionMap = { **region_table }
-starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
+        regionMap["Manual"] = {
+            "requires": [],
+            "connects_to": starting_regions
+        }
 
-if len(starting_regions) == 0:
-    starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
+        globals()["starting_regions"] = starting_regions
+        globals()["regionMap"] = regionMap
 
-regionMap["Manual"] = {
-    "requires": [],
-    "connects_to": starting_regions
-}
+    return globals()["regionMap"]
 
+def __getattr__(name: str):
+    if name in ("regionMap", "starting_regions"):
+        get_region_map()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_enabled_region_locations(world: World, multiworld: MultiWorld, player: int) -> Mapping[str, tuple[str, ...]]:
+    """Return region name -> the names of its enabled locations, in location_table order"""
+    regionMap = get_region_map()
+
+    region_locations: dict[str, list[str]] = {region: [] for region in regionMap}
+    for location in world.location_table:
+        if "region" in location and location["region"] in region_locations:
+            if is_location_enabled(multiworld, player, location):
+                region_locations[location["region"]].append(location["name"])
+    return MappingProxyType({region: tuple(names) for region, names in region_locations.items()})
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    regionMap = get_region_map()
+    # Only depends on the options, players with the same options can share it
+    region_locations = world.get_option_artifact("enabled_region_locations", lambda: get_enabled_region_locations(world, multiworld, player))
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -32,11 +65,7 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = list(region_locations[region])
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING, Optional
 from enum import IntEnum
 from operator import eq, ge, le
 
-from .Regions import regionMap
+from .Regions import get_region_map
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
     format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
@@ -101,7 +101,47 @@ def evaluate_postfix(expr: str, location: str) -> bool:
 
     return stack.pop()
 
+def parse_requires_string(requires: str) -> tuple[tuple[str, str, str, str], ...]:
+    """Split a string requires into its |item| and |@category| parts as (the part as written, 'item' or 'category', name, count)"""
+    parts = []
+    for item in re.findall(r'\|[^|]+\|', requires):
+        require_type = 'item'
+
+        if '|@' in item:
+            require_type = 'category'
+
+        item_base = item
+        item = item.lstrip('|@$').rstrip('|')
+
+        item_parts = item.split(":")  # type: list[str]
+        item_name = item
+        item_count = "1"
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0].strip()
+            item_count = item_parts[1].strip()
+
+        parts.append((item_base, require_type, item_name, item_count))
+    return tuple(parts)
+
+def parse_data_requires(location_table: list, region_map: dict) -> dict[str, tuple[tuple[str, str, str, str], ...]]:
+    """Parse the string requires of the locations and regions (and their entrances/exits) that don't call any {function()}.\n
+    Those never change, so every player's rules can use the same parsed parts instead of parsing them each time they're checked."""
+    requires_strings = [location["requires"] for location in location_table if "requires" in location]
+    for region in region_map.values():
+        if "requires" in region:
+            requires_strings.append(region["requires"])
+        for key in ("entrance_requires", "exit_requires"):
+            requires_strings.extend(region.get(key, {}).values())
+
+    return {requires: parse_requires_string(requires) for requires in requires_strings
+            if isinstance(requires, str) and not re.search(r'\{(\w+)\((.*?)\)\}', requires)}
+
 def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    regionMap = get_region_map()
+    parsed_requires = world.get_parsed_requires()
+    category_items_names = world.get_category_item_names()
+
     # this is only called when the area (think, location or region) has a "requires" field that is a string
     def checkRequireStringForArea(state: CollectionState, area: dict):
         requires_list = area["requires"]
@@ -154,32 +194,19 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                 requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
             return requires_list
 
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
+        # the requires of the data without functions were parsed once for every player
+        requires_parts = parsed_requires.get(requires_list)
+        if requires_parts is None:
+            requires_list = findAndRecursivelyExecuteFunctions(requires_list)
+            requires_parts = parse_requires_string(requires_list)
 
         # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
-
-            if '|@' in item:
-                require_type = 'category'
-
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
-
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
-
-
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
-
+        for item_base, require_type, item_name, item_count in requires_parts:
             total = 0
 
             if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+                category_item_names = category_items_names.get(item_name, ())
+                category_items_counts = sum([items_counts.get(category_item_name, 0) for category_item_name in category_item_names])
                 if item_count.lower() == 'all':
                     item_count = category_items_counts
                 elif item_count.lower() == 'half':
@@ -193,8 +220,8 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                     except ValueError as e:
                         raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
 
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
+                for category_item_name in category_item_names:
+                    total += state.count(category_item_name, player)
 
                     if total >= item_count:
                         requires_list = requires_list.replace(item_base, "1")
@@ -431,8 +458,8 @@ def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None)
     if require_type == 'category':
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-            category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+            category_item_names = world.get_category_item_names().get(item_name, ())
+            category_items_counts = sum([items_counts.get(category_item_name, 0) for category_item_name in category_item_names])
             item_count = clamp(int(item_count), 0, category_items_counts)
         return f"|@{item_name}:{item_count}|"
     elif require_type == 'item':
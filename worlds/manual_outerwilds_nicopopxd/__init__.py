@@ -2,29 +2,34 @@ from base64 import b64encode
 import logging
 import os
 import json
-from typing import Callable, Optional, Counter
+from collections import deque
+from itertools import groupby
+from typing import Any, Callable, Optional, Counter
 import webbrowser
 
 import Utils
-from worlds.generic.Rules import forbid_items_for_player
 from worlds.LauncherComponents import Component, SuffixIdentifier, components, Type, launch_subprocess, icon_paths
 
-from .Data import item_table, location_table, region_table, category_table
+from .Data import category_table, report_json_validation_errors
 from .Game import game_name, filler_item_name, starting_items
 from .Meta import world_description, world_webworld, enable_region_diagram
-from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Locations import location_table, location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
+from .Items import item_table, item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
-from .Regions import create_regions
+from .Regions import create_regions, get_region_map
 from .Items import ManualItem
-from .Rules import set_rules
-from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
-
-from BaseClasses import CollectionState, ItemClassification, Item
+from .Rules import set_rules, parse_data_requires
+from .Options import ManualOptionsDataclass
+from .Helpers import is_item_enabled, get_option_value, resolve_yaml_option, get_item_value_deltas, \
+    get_category_enabled_cache, reset_category_enabled_cache, set_player_item_index, refresh_player_item_indexes, \
+    HookRegistry, pick_starting_items, remove_items_from_pool, ItemCounts, get_forbidden_item_names, \
+    get_placement_candidates, get_category_item_names, get_disabled_categories_mask, get_options_key, OptionArtifactCache
+
+from BaseClasses import CollectionState, ItemClassification, Item, Location
 from Options import PerGameCommonOptions
 from worlds.AutoWorld import World
+from worlds.generic.Rules import forbid_items_for_player
 
 from .hooks.World import \
     hook_get_filler_item_name, before_create_regions, after_create_regions, \
@@ -36,13 +41,18 @@ from .hooks.World import \
     before_extend_hint_information, after_extend_hint_information, \
     after_collect_item, after_remove_item
 from .hooks.Data import hook_interpret_slot_data
+from .hooks import World as world_hooks_module
+from .hooks import Helpers as helpers_hooks_module
+
+# The tables with a json check were all loaded by the imports above, display all of their errors at once
+report_json_validation_errors()
 
 class ManualWorld(World):
     __doc__ = world_description
     game: str = game_name
     web = world_webworld
 
-    options_dataclass = manual_options_data
+    options_dataclass = ManualOptionsDataclass()
     data_version = 2
     required_client_version = (0, 3, 4)
 
@@ -58,8 +68,17 @@ class ManualWorld(World):
 
     filler_item_name = filler_item_name
 
-    item_counts: dict[int, Counter[str]] = {}
-    item_counts_progression: dict[int, Counter[str]] = {}
+    # The hooks of hooks/World.py that were changed from the template, the others aren't called
+    world_hooks = HookRegistry(world_hooks_module)
+    # What collect and remove add to/remove from the state for each item with values, and if they need to call their hooks
+    item_value_deltas = get_item_value_deltas(item_name_to_item)
+    call_after_collect_item = world_hooks.is_active("after_collect_item")
+    call_after_remove_item = world_hooks.is_active("after_remove_item")
+
+    item_counts: dict[int, Counter[str]]
+    item_counts_progression: dict[int, Counter[str]]
+    check_item_counts: bool = bool(os.environ.get("MANUAL_CHECK_ITEM_COUNTS"))
+    """Compare the item counts kept up to date during create_items with a full recount, set the MANUAL_CHECK_ITEM_COUNTS environment variable to enable it"""
     start_inventory = {}
 
     location_id_to_name = location_id_to_name
@@ -67,12 +86,71 @@ class ManualWorld(World):
     location_name_to_location = location_name_to_location
     location_name_groups = location_name_groups
     victory_names = victory_names
+    # Only depend on the data so they're built once, by stage_generate_early, and shared by every player
+    _location_forbidden_item_names: Optional[dict[str, frozenset[str]]] = None
+    _location_placement_candidates: Optional[dict[str, tuple[frozenset[str], str]]] = None
+    _category_item_names: Optional[dict[str, tuple[str, ...]]] = None
+    _parsed_requires: Optional[dict[str, tuple[tuple[str, str, str, str], ...]]] = None
+    # The locations with a place_item or place_item_category, they're the same for every player
+    manual_locations_with_placements = {name: location for name, location in location_name_to_location.items() if "place_item" in location or "place_item_category" in location}
+
+    # What each player builds from its options alone, shared by the players with the same options (see get_option_artifact)
+    option_artifacts = OptionArtifactCache()
+    # The item and location enabled hooks can do anything for each player (like the category hook being called for the player),
+    # the artifacts are only shared while they're left as in the template so an item or location is enabled by its categories alone
+    helpers_hooks = HookRegistry(helpers_hooks_module)
+    share_option_artifacts = not helpers_hooks.is_active("before_is_item_enabled") and not helpers_hooks.is_active("before_is_location_enabled")
 
     # UT (the universal-est of trackers) can now generate without a YAML
     ut_can_gen_without_yaml = False  # Temporary disable until we fix the bugs with it
 
+    def __init__(self, multiworld, player: int):
+        super().__init__(multiworld, player)
+        # Filled by create_items, per world instead of shared by every world of the class
+        self.item_counts = {}
+        self.item_counts_progression = {}
+
+    @classmethod
+    def get_location_forbidden_item_names(cls) -> dict[str, frozenset[str]]:
+        """Return location name -> names of the items its dont_place_item and dont_place_item_category forbid.\n
+        It only depends on the data, so it's resolved once and shared by every player."""
+        if cls._location_forbidden_item_names is None:
+            cls._location_forbidden_item_names = get_forbidden_item_names(cls.location_name_to_location.values(), cls.item_name_to_item)
+        return cls._location_forbidden_item_names
+
+    @classmethod
+    def get_location_placement_candidates(cls) -> dict[str, tuple[frozenset[str], str]]:
+        """Return location name -> (names of the items its place_item* allow and dont_place_item* don't forbid, error if none are in the pool)"""
+        if cls._location_placement_candidates is None:
+            cls._location_placement_candidates = get_placement_candidates(cls.manual_locations_with_placements.values(), cls.item_name_to_item)
+        return cls._location_placement_candidates
+
+    @classmethod
+    def get_category_item_names(cls) -> dict[str, tuple[str, ...]]:
+        """Return category -> names of its items, for the |@category| requires"""
+        if cls._category_item_names is None:
+            cls._category_item_names = get_category_item_names(cls.item_name_to_item)
+        return cls._category_item_names
+
+    @classmethod
+    def get_parsed_requires(cls) -> dict[str, tuple[tuple[str, str, str, str], ...]]:
+        """Return requires string -> its parsed |item| and |@category| parts, for the string requires of the data that don't call functions"""
+        if cls._parsed_requires is None:
+            cls._parsed_requires = parse_data_requires(cls.location_table, get_region_map())
+        return cls._parsed_requires
+
+    def get_option_artifact(self, name: str, build: Callable[[], Any]) -> Any:
+        """Return what build() returns for this player's options, the players with the same options share it so it must not be changed.\n
+        build must only depend on the options and on which categories are enabled. The key includes the player's disabled categories,
+        so a before_is_category_enabled hook is still called for every player. Nothing is shared when share_option_artifacts is False."""
+        if not self.share_option_artifacts:
+            return build()
+        return self.option_artifacts.get(name, (get_options_key(self), get_disabled_categories_mask(self.multiworld, self.player)), build)
+
     def get_filler_item_name(self) -> str:
-        return hook_get_filler_item_name(self, self.multiworld, self.player) or self.filler_item_name
+        if self.world_hooks.is_active("hook_get_filler_item_name"):
+            return hook_get_filler_item_name(self, self.multiworld, self.player) or self.filler_item_name
+        return self.filler_item_name
 
     def interpret_slot_data(self, slot_data: dict[str, any]):
         #this is called by tools like UT
@@ -86,15 +164,27 @@ class ManualWorld(World):
                 regen = True
 
         regen = hook_interpret_slot_data(self, self.player, slot_data) or regen
+        if regen:
+            reset_category_enabled_cache(self) # The options changed so the enabled categories might have too
         return regen
 
     @classmethod
     def stage_assert_generate(cls, multiworld) -> None:
         runGenerationDataValidation(cls)
+        logging.debug(cls.world_hooks.report())
+
+    @classmethod
+    def stage_generate_early(cls, multiworld) -> None:
+        # Built once for every slot of this game instead of by the first slot needing them
+        cls.get_location_forbidden_item_names()
+        cls.get_location_placement_candidates()
+        cls.get_category_item_names()
+        cls.get_parsed_requires()
 
 
     def create_regions(self):
-        before_create_regions(self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_create_regions"):
+            before_create_regions(self, self.multiworld, self.player)
 
         create_regions(self, self.multiworld, self.player)
 
@@ -107,15 +197,15 @@ class ManualWorld(World):
         location_game_complete.place_locked_item(
             ManualItem("__Victory__", ItemClassification.progression, None, player=self.player))
 
-        after_create_regions(self, self.multiworld, self.player)
+        if self.world_hooks.is_active("after_create_regions"):
+            after_create_regions(self, self.multiworld, self.player)
 
-    def create_items(self):
-        # Generate item pool
-        pool: list[Item] = []
+    def build_items_config(self) -> tuple[tuple[tuple[str, int], ...], tuple[str, ...]]:
+        """Return the count of every item once the disabled ones are set to 0, and the names of the traps"""
         traps = []
         configured_item_names = self.item_id_to_name.copy()
 
-        items_config: dict[str, int|dict[ItemClassification | str | int, int]] = {}
+        items_config: list[tuple[str, int]] = []
         for name in configured_item_names.values():
             if name == "__Victory__": continue
             if name == filler_item_name: continue # intentionally using the Game.py filler_item_name here because it's a non-Items item
@@ -130,17 +220,30 @@ class ManualWorld(World):
                 if not is_item_enabled(self.multiworld, self.player, item):
                     item_count = 0
 
-            items_config[name] = item_count
+            items_config.append((name, item_count))
+
+        return tuple(items_config), tuple(traps)
+
+    def create_items(self):
+        # Generate item pool
+        pool: list[Item] = []
+        # Only depends on the options, players with the same options can share it
+        base_items_config, traps = self.get_option_artifact("items_config", self.build_items_config)
+        traps = list(traps)
+        items_config: dict[str, int|dict[ItemClassification | str | int, int]] = dict(base_items_config)
 
-        items_config = before_create_items_all(items_config, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_create_items_all"):
+            items_config = before_create_items_all(items_config, self, self.multiworld, self.player)
 
+        # Counted as they are created and removed, the pool is only counted again when a hook might have changed it
+        counts = ItemCounts()
         for name, configs in items_config.items():
             total_created = 0
             if type(configs) is int:
                 total_created = configs
-                for _ in range(configs):
-                    new_item = self.create_item(name)
-                    pool.append(new_item)
+                created = self.create_items_bulk(name, configs)
+                pool.extend(created)
+                counts.add(created)
             elif type(configs) is dict:
                 for cat, count in configs.items():
                     total_created += count
@@ -157,9 +260,9 @@ class ManualWorld(World):
                         except Exception as ex:
                             raise Exception(f"Item override '{cat}' for {name} improperly defined\n\n{type(ex).__name__}:{ex}")
 
-                    for _ in range(count):
-                        new_item = self.create_item(name, true_class)
-                        pool.append(new_item)
+                    created = self.create_items_bulk(name, count, true_class)
+                    pool.extend(created)
+                    counts.add(created)
             else:
                 raise Exception(f"Item override for {name} improperly defined")
 
@@ -191,7 +294,9 @@ class ManualWorld(World):
                     raise Exception(f"Item {name}'s 'local_early' has an invalid value of '{item['local_early']}'. \nA boolean or an integer was expected.")
 
 
-        pool = before_create_items_starting(pool, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_create_items_starting"):
+            pool = before_create_items_starting(pool, self, self.multiworld, self.player)
+            counts = ItemCounts(pool)
 
         items_started: list[Item] = []
 
@@ -202,182 +307,184 @@ class ManualWorld(World):
                 # if there's a condition on having a previous item, check for any of them
                 # if not found in items started, this starting item rule shouldn't execute, and check the next one
                 if "if_previous_item" in starting_item_block:
-                    matching_items = [item for item in items_started if item.name in starting_item_block["if_previous_item"]]
-
-                    if len(matching_items) == 0:
+                    previous_item_names = set(starting_item_block["if_previous_item"])
+                    if not any(item.name in previous_item_names for item in items_started):
                         continue
 
-                # start with the full pool of items
-                items = pool
-
-                # if the setting lists specific item names, limit the items to just those
-                if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
-
-                # if the setting lists specific item categories, limit the items to ones that have any of those categories
-                if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
-                    items = [item for item in pool if item.name in items_in_categories]
-
-                self.random.shuffle(items)
-
-                # if the setting lists a specific number of random items that should be pulled, only use a subset equal to that number
-                if "random" in starting_item_block:
-                    items = items[0:starting_item_block["random"]]
-
-                for starting_item in items:
+                for starting_item in pick_starting_items(pool, starting_item_block, self.random, self.item_name_to_item, counts):
                     items_started.append(starting_item)
                     self.multiworld.push_precollected(starting_item)
-                    pool.remove(starting_item)
 
-        self.start_inventory = {i.name: items_started.count(i) for i in items_started}
+        # items are equal when they have the same name and player, that's what items_started.count used to count
+        started_counts = Counter((i.name, i.player) for i in items_started)
+        self.start_inventory = {i.name: started_counts[(i.name, i.player)] for i in items_started}
 
-        pool = before_create_items_filler(pool, self, self.multiworld, self.player)
-        pool = self.adjust_filler_items(pool, traps)
-        pool = after_create_items(pool, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_create_items_filler"):
+            pool = before_create_items_filler(pool, self, self.multiworld, self.player)
+            counts = ItemCounts(pool + items_started)
+        pool = self.adjust_filler_items(pool, traps, counts)
+        if self.world_hooks.is_active("after_create_items"):
+            pool = after_create_items(pool, self, self.multiworld, self.player)
+            counts = ItemCounts(pool + items_started)
 
         # need to put all of the items in the pool so we can have a full state for placement
         # then will remove specific item placements below from the overall pool
         self.multiworld.itempool += pool
+        # the player's items are the pool plus what's already placed, like the victory event
+        placed_items = [location.item for location in self.multiworld.get_filled_locations(self.player) if location.item.player == self.player]
+        set_player_item_index(self, placed_items + pool)
 
-        real_pool = pool + items_started
-        self.item_counts[self.player] = self.get_item_counts(pool=real_pool)
-        self.item_counts_progression[self.player] = self.get_item_counts(pool=real_pool, only_progression=True)
+        if self.check_item_counts:
+            assert counts == ItemCounts(pool + items_started), f"{self.game}: Player {self.player}'s item counts don't match a recount of its items"
+        self.item_counts[self.player] = counts.all
+        self.item_counts_progression[self.player] = counts.progression
 
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
-        name = before_create_item(name, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_create_item"):
+            name = before_create_item(name, self, self.multiworld, self.player)
 
-        item = self.item_name_to_item[name]
-        if class_override is not None:
-            classification = class_override
-        else:
-            classification = ItemClassification.filler
+        classification = class_override if class_override is not None else self.get_item_classification(name)
+        item_object = ManualItem(name, classification,
+                        self.item_name_to_id[name], player=self.player)
 
-            if "trap" in item and item["trap"]:
-                classification |= ItemClassification.trap
+        if self.world_hooks.is_active("after_create_item"):
+            item_object = after_create_item(item_object, self, self.multiworld, self.player)
 
-            if "useful" in item and item["useful"]:
-                classification |= ItemClassification.useful
+        return item_object
 
-            if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
-                classification |= ItemClassification.progression_skip_balancing
-            elif "progression" in item and item["progression"]:
-                classification |= ItemClassification.progression
+    def create_items_bulk(self, name: str, count: int, class_override: Optional['ItemClassification']=None) -> list[Item]:
+        """Create count copies of an item, the same as calling create_item count times.\n
+        The name, classification and id are only resolved once, before_create_item and after_create_item
+        are still called for every copy if they were changed to do more than returning what they're given."""
+        if count <= 0:
+            return []
 
-        item_object = ManualItem(name, classification,
-                        self.item_name_to_id[name], player=self.player)
+        if self.world_hooks.is_active("before_create_item") or self.world_hooks.is_active("after_create_item"):
+            return [self.create_item(name, class_override) for _ in range(count)]
 
-        item_object = after_create_item(item_object, self, self.multiworld, self.player)
+        classification = class_override if class_override is not None else self.get_item_classification(name)
+        item_id = self.item_name_to_id[name]
+        return [ManualItem(name, classification, item_id, player=self.player) for _ in range(count)]
 
-        return item_object
+    def get_item_classification(self, name: str) -> ItemClassification:
+        """Return the classification of an item from its progression/useful/trap properties"""
+        item = self.item_name_to_item[name]
+        classification = ItemClassification.filler
+
+        if "trap" in item and item["trap"]:
+            classification |= ItemClassification.trap
+
+        if "useful" in item and item["useful"]:
+            classification |= ItemClassification.useful
+
+        if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
+            classification |= ItemClassification.progression_skip_balancing
+        elif "progression" in item and item["progression"]:
+            classification |= ItemClassification.progression
+
+        return classification
 
     # Item Value need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
-        after_collect_item(self, state, change, item)
+        if change and item.name in self.item_value_deltas:
+            prog_items = state.prog_items[item.player]
+            for key, amount in self.item_value_deltas[item.name]:
+                prog_items[key] += amount
+        if self.call_after_collect_item:
+            after_collect_item(self, state, change, item)
         return change
 
     def remove(self, state: CollectionState, item: Item) -> bool:
         change = super().remove(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
-        after_remove_item(self, state, change, item)
+        if change and item.name in self.item_value_deltas:
+            prog_items = state.prog_items[item.player]
+            for key, amount in self.item_value_deltas[item.name]:
+                prog_items[key] -= amount
+        if self.call_after_remove_item:
+            after_remove_item(self, state, change, item)
         return change
 
     def set_rules(self):
-        before_set_rules(self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_set_rules"):
+            before_set_rules(self, self.multiworld, self.player)
 
         set_rules(self, self.multiworld, self.player)
 
-        after_set_rules(self, self.multiworld, self.player)
+        if self.world_hooks.is_active("after_set_rules"):
+            after_set_rules(self, self.multiworld, self.player)
 
     def generate_basic(self):
-        before_generate_basic(self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_generate_basic"):
+            before_generate_basic(self, self.multiworld, self.player)
 
         # Handle item forbidding
-        manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
-        locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
-        for location in locations_with_forbid:
-            manual_location = manual_locations_with_forbid[location.name]
-            forbidden_item_names = []
+        location_forbidden_item_names = self.get_location_forbidden_item_names()
+        for location in self.multiworld.get_unfilled_locations(player=self.player):
+            if location.name in location_forbidden_item_names:
+                forbid_items_for_player(location, location_forbidden_item_names[location.name], self.player)
 
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
+        # Handle specific item placements using fill_restrictive
+        manual_locations_with_placements = self.manual_locations_with_placements
+        locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements]
+        if locations_with_placements:
+            self.place_items_at_locations(locations_with_placements)
 
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
+        if self.world_hooks.is_active("after_generate_basic"):
+            after_generate_basic(self, self.multiworld, self.player)
 
-            if forbidden_item_names:
-                forbid_items_for_player(location, set(forbidden_item_names), self.player)
+        # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
+        if enable_region_diagram:
+            from Utils import visualize_regions
+            visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
-        # Handle specific item placements using fill_restrictive
-        manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
-        locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
+    def place_items_at_locations(self, locations_with_placements: list[Location]):
+        """Place an item from the pool at each location according to its place_item/place_item_category (and dont_place_*).\n
+        The player's pool items are indexed by name once and the placed items are all removed from the pool in a single pass at the end.
+        Items are picked and removed like scanning the pool and calling itempool.remove for each location did, so seeds stay the same."""
+        # name -> indices in the itempool of the player's items with that name, in pool order
+        pool_indices: dict[str, deque[int]] = {}
+        for index, item in enumerate(self.multiworld.itempool):
+            if item.player == self.player:
+                pool_indices.setdefault(item.name, deque()).append(index)
+        removed_indices = set()
+
+        placement_candidates = self.get_location_placement_candidates()
         for location in locations_with_placements:
-            manual_location = manual_locations_with_placements[location.name]
-            eligible_items = []
-            eligible_item_names = []
-            forbidden_item_names = []
-            place_messages = []
-            forbid_messages = []
-
-            #First we get possible items names
-            if manual_location.get("place_item"):
-                eligible_item_names += manual_location["place_item"]
-                place_messages.append('", "'.join(manual_location["place_item"]))
-
-            if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
-                place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
-
-            # Second we check for forbidden items names
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names += manual_location["dont_place_item"]
-                forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
-
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
-                forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
-
-            # If we forbid some names, check for those in the possible names and remove them
-            if forbidden_item_names:
-                eligible_item_names = [name for name in eligible_item_names if name not in forbidden_item_names]
-
-            if eligible_item_names:
-                eligible_items = [item for item in self.multiworld.itempool if item.player == self.player and item.name in eligible_item_names]
+            eligible_item_names, error = placement_candidates[location.name]
+            eligible_indices = sorted(index for name in eligible_item_names for index in pool_indices.get(name, ()))
+            eligible_items = [self.multiworld.itempool[index] for index in eligible_indices]
 
             if len(eligible_items) == 0:
-                nl = "\n"
-                if forbidden_item_names:
-                    raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}".\n    No items that match "{f"{nl}     or ".join(place_messages)}"\n    Maybe because of forbidden "{f"{nl}     or ".join(forbid_messages)}"')
-                raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}". \n    No items that match "{f"{nl}     or ".join(place_messages)}"')
+                raise Exception(error)
 
             item_to_place = self.random.choice(eligible_items)
             location.place_locked_item(item_to_place)
 
             # remove the item we're about to place from the pool so it isn't placed twice
-            self.multiworld.itempool.remove(item_to_place)
-
+            # like itempool.remove, that's the first remaining item with the same name and player
+            # it's still one of the player's items so the player_item_index doesn't change
+            removed_indices.add(pool_indices[item_to_place.name].popleft())
 
-        after_generate_basic(self, self.multiworld, self.player)
+        self.multiworld.itempool[:] = [item for index, item in enumerate(self.multiworld.itempool) if index not in removed_indices]
 
-        # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
-        if enable_region_diagram:
-            from Utils import visualize_regions
-            visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
+    @classmethod
+    def stage_pre_fill(cls, multiworld) -> None:
+        # start_inventory_from_pool, item links and hooks can change the players' items after create_items,
+        # the indexes that don't match anymore are rebuilt with a single pass over every item for all the players
+        refresh_player_item_indexes(multiworld, (world for world in multiworld.worlds.values() if isinstance(world, cls)))
+        if cls.share_option_artifacts:
+            logging.debug(f"{cls.game}: Option artifacts cache has {cls.option_artifacts.hits} hits and {cls.option_artifacts.misses} misses so far")
 
     def pre_fill(self):
         # DataValidation after all the hooks are done but before fill
         runPreFillDataValidation(self, self.multiworld)
+        logging.debug(f"{self.game}: Player {self.player}'s enabled categories cache avoided {get_category_enabled_cache(self.multiworld, self.player).hook_calls_avoided} category checks")
 
     def fill_slot_data(self):
-        slot_data = before_fill_slot_data({}, self, self.multiworld, self.player)
+        slot_data = {}
+        if self.world_hooks.is_active("before_fill_slot_data"):
+            slot_data = before_fill_slot_data(slot_data, self, self.multiworld, self.player)
 
         # slot_data["DeathLink"] = bool(self.multiworld.death_link[self.player].value)
         common_options = set(PerGameCommonOptions.type_hints.keys())
@@ -386,7 +493,8 @@ class ManualWorld(World):
                 continue
             slot_data[option_key] = get_option_value(self.multiworld, self.player, option_key)
 
-        slot_data = after_fill_slot_data(slot_data, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("after_fill_slot_data"):
+            slot_data = after_fill_slot_data(slot_data, self, self.multiworld, self.player)
 
         return slot_data
 
@@ -397,10 +505,12 @@ class ManualWorld(World):
             f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
 
     def write_spoiler(self, spoiler_handle):
-        before_write_spoiler(self, self.multiworld, spoiler_handle)
+        if self.world_hooks.is_active("before_write_spoiler"):
+            before_write_spoiler(self, self.multiworld, spoiler_handle)
 
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
-        before_extend_hint_information(hint_data, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("before_extend_hint_information"):
+            before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
         for location in self.multiworld.get_locations(self.player):
             if not location.address:
@@ -410,7 +520,8 @@ class ManualWorld(World):
                     hint_data.update({self.player: {}})
                 hint_data[self.player][location.address] = self.location_name_to_location[location.name]["hint_entrance"]
 
-        after_extend_hint_information(hint_data, self, self.multiworld, self.player)
+        if self.world_hooks.is_active("after_extend_hint_information"):
+            after_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
     ###
     # Non-standard AP world methods
@@ -421,11 +532,18 @@ class ManualWorld(World):
     The maximum time a location/region's requirement can loop to check for functions\n
     One thing to remember is the more you loop the longer generation will take. So probably leave it as is unless you really needs it."""
 
+    prefill_reachability_check: bool = True
+    """Default: True\n
+    Before fill, check that every location can be reached with all of the player's items collected\n
+    and list the unreachable ones with the requirements blocking them, instead of letting fill fail much later."""
+
     def add_filler_items(self, item_pool, traps):
         Utils.deprecate("Use adjust_filler_items instead.")
         return self.adjust_filler_items(item_pool, traps)
 
-    def adjust_filler_items(self, item_pool, traps):
+    def adjust_filler_items(self, item_pool, traps, counts: Optional[ItemCounts] = None):
+        """Add filler and traps to item_pool or remove non-progression items from it until it fits the player's locations.\n
+        If given, counts is kept up to date with the items added and removed."""
         extras = len(self.multiworld.get_unfilled_locations(player=self.player)) - len(item_pool)
 
         if extras > 0:
@@ -436,30 +554,39 @@ class ManualWorld(World):
             trap_count = extras * trap_percent // 100
             filler_count = extras - trap_count
 
-            for _ in range(0, trap_count):
-                extra_item = self.create_item(self.random.choice(traps))
-                item_pool.append(extra_item)
-
-            for _ in range(0, filler_count):
-                extra_item = self.create_item(self.get_filler_item_name())
-                item_pool.append(extra_item)
+            trap_names = [self.random.choice(traps) for _ in range(0, trap_count)]
+            filler_names = [self.get_filler_item_name() for _ in range(0, filler_count)]
+            for name, same_names in groupby(trap_names + filler_names):
+                created = self.create_items_bulk(name, len(list(same_names)))
+                item_pool.extend(created)
+                if counts is not None:
+                    counts.add(created)
         elif extras < 0:
             logging.warning(f"{self.game} has more items than locations. {abs(extras)} non-progression items will be removed at random.")
             # Filler is only assigned if the item doesn't have any other tags, so it only has to be covered by itself.
             # Skip Balancing is also not covered due to how it's only supported when paired with Progression.
             # As a result, these cover every possible combination can be removed.
-            fillers = [item for item in item_pool if item.classification == ItemClassification.filler]
-            traps = [item for item in item_pool if item.classification == ItemClassification.trap]
-            useful = [item for item in item_pool if item.classification == ItemClassification.useful]
+            fillers = []
+            traps = []
+            useful = []
             # Useful + Trap is classified separately so that it can have a unique priority ranking.
-            useful_traps = [item for item in item_pool if
-                            ItemClassification.progression not in item.classification
-                            and ItemClassification.useful in item.classification
-                            and ItemClassification.trap in item.classification]
+            useful_traps = []
+            for item in item_pool:
+                if item.classification == ItemClassification.filler:
+                    fillers.append(item)
+                elif item.classification == ItemClassification.trap:
+                    traps.append(item)
+                elif item.classification == ItemClassification.useful:
+                    useful.append(item)
+                elif (ItemClassification.progression not in item.classification
+                      and ItemClassification.useful in item.classification
+                      and ItemClassification.trap in item.classification):
+                    useful_traps.append(item)
             self.random.shuffle(fillers)
             self.random.shuffle(traps)
             self.random.shuffle(useful)
             self.random.shuffle(useful_traps)
+            removed_items = []
             for _ in range(0, abs(extras)):
                 popped = None
                 if fillers:
@@ -473,7 +600,10 @@ class ManualWorld(World):
                 else:
                     logging.warning("Could not remove enough non-progression items from the pool.")
                     break
-                item_pool.remove(popped)
+                removed_items.append(popped)
+            removed_items = remove_items_from_pool(item_pool, removed_items)
+            if counts is not None:
+                counts.remove(removed_items)
 
         return item_pool
 
@@ -494,19 +624,22 @@ class ManualWorld(World):
         if pool is not None:
             return Counter([i.name for i in pool if not only_progression or i.advancement])
 
+        # The counts are kept on each world, the player's own world has them
+        world = self if player == self.player else self.multiworld.worlds.get(player, self)
         if only_progression:
-            return self.item_counts_progression.get(player, Counter())
+            return getattr(world, "item_counts_progression", {}).get(player, Counter())
         else:
-            return self.item_counts.get(player, Counter())
+            return getattr(world, "item_counts", {}).get(player, Counter())
 
 
     def client_data(self):
+        from .Data import region_table
         return {
             "game": self.game,
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
-            'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
+            'items': {name: dict(item) for name, item in self.item_name_to_item.items()},
+            'locations': {name: dict(location) for name, location in self.location_name_to_location.items()},
             # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
             'regions': region_table,
             'categories': category_table
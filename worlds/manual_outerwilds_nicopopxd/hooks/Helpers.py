@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from BaseClasses import MultiWorld
-from ..Locations import ManualLocation
-from ..Items import ManualItem
+
+if TYPE_CHECKING:
+    from ..Items import ManualItem
+    from ..Locations import ManualLocation
 
 
 # Use this if you want to override the default behavior of is_option_enabled
@@ -14,14 +16,14 @@ def before_is_category_enabled(multiworld: MultiWorld, player: int, category_nam
 
 # Use this if you want to override the default behavior of is_option_enabled
 # Return True to enable the item, False to disable it, or None to use the default behavior
-def before_is_item_enabled(multiworld: MultiWorld, player: int, item: ManualItem) -> Optional[bool]:
+def before_is_item_enabled(multiworld: MultiWorld, player: int, item: "ManualItem") -> Optional[bool]:
     if item.get('name','').endswith('Access') and 'DLC - Eye' in item.get('category', []):
         return bool(multiworld.worlds[player].options.dlc_access_items.value)
     return checkobject(multiworld, player, item)
 
 # Use this if you want to override the default behavior of is_option_enabled
 # Return True to enable the location, False to disable it, or None to use the default behavior
-def before_is_location_enabled(multiworld: MultiWorld, player: int, location: ManualLocation) -> Optional[bool]:
+def before_is_location_enabled(multiworld: MultiWorld, player: int, location: "ManualLocation") -> Optional[bool]:
     return checkobject(multiworld, player, location)
 
 def checkobject(multiworld: MultiWorld, player: int, obj: object) -> Optional[bool]:
@@ -36,6 +38,7 @@ def checkobject(multiworld: MultiWorld, player: int, obj: object) -> Optional[bo
         Optional[bool]: enabled or not,
         return None if no category are enable or disabled
     """
+    from ..Helpers import get_category_hook_result # imported here because otherwise cause circular import
     world = multiworld.worlds.get(player)
     if not hasattr(world, 'categoryInit'):
         InitCategories(world, player)
@@ -44,7 +47,7 @@ def checkobject(multiworld: MultiWorld, player: int, obj: object) -> Optional[bo
     resultNo = False
     categories = obj.get('category', [])
     for category in categories:
-        result = before_is_category_enabled(multiworld, player, category)
+        result = get_category_hook_result(multiworld, player, category)
         if result is not None:
             if result:
                 resultYes = True
@@ -60,6 +63,7 @@ def checkobject(multiworld: MultiWorld, player: int, obj: object) -> Optional[bo
 def InitCategories(MultiWorld: MultiWorld, player: int):
     """Mark categories as Enabled or Disabled based on options"""
     from .Options import RandomContent, Goal #imported here because otherwise cause circular import
+    from ..Helpers import reset_category_enabled_cache
     if not hasattr(MultiWorld, 'worlds'):
         raise Exception("wrong multiworld type")
 
@@ -97,6 +101,7 @@ def InitCategories(MultiWorld: MultiWorld, player: int):
         elif (goal == Goal.option_stuck_in_stranger or goal == Goal.option_stuck_in_dream):
             set_category_status(base, player, 'need_warpdrive', True)
     base.categoryInit = True
+    reset_category_enabled_cache(base) # Categories checked before this could have changed
 
 def set_category_status(world, player: int, category_name: str, status: bool):
     if world.category_table.get(category_name, {}):
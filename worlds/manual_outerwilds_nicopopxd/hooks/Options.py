@@ -1,5 +1,6 @@
 # Object classes from AP that represent different types of options that you can create
-from Options import FreeText, NumericOption, Toggle, DefaultOnToggle, Choice, TextChoice, Range, NamedRange
+from Options import FreeText, NumericOption, Toggle, DefaultOnToggle, Choice, TextChoice, Range, NamedRange, OptionGroup, Option, PerGameCommonOptions
+from typing import Type, Any
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
 from ..Helpers import is_option_enabled, get_option_value
@@ -145,21 +146,20 @@ def before_options_defined(options: dict) -> dict:
     return options
 
 # This is called after any manual options are defined, in case you want to see what options are defined or want to modify the defined options
-def after_options_defined(options: dict) -> dict:
+def after_options_defined(options: Type[PerGameCommonOptions]):
+    # To access a modifiable version of options check the dict in options.type_hints
     # the generated goal option will not keep your defined values or documentation string you'll need to add them here:
     # To automatically convert your own goal to alias of the generated goal uncomment this below and replace 'Goal' with your own option of type Choice
     your_goal_class = Goal #Your Goal class here
-    generated_goal = options.get('goal', {})
+    generated_goal = options.type_hints.get('goal', None)
     if generated_goal and issubclass(your_goal_class, Choice) and not issubclass(generated_goal, your_goal_class):
-        goals = {'option_' + i: v for i, v in generated_goal.options.items() if i != 'default'}
         for option, value in your_goal_class.options.items():
             if option == 'default':
                 continue
-            goals[f"alias_{option}"] = value
-        options['goal'] = type('goal', (Choice,), goals)
-        options['goal'].default = your_goal_class.options.get('default', generated_goal.default)
-        options['goal'].__doc__ = your_goal_class.__doc__ or options['goal'].__doc__
-    return options
+            generated_goal.aliases[option] = value
+            generated_goal.options[option] = value #for an alias to be valid it must also be in options
+        generated_goal.default = your_goal_class.options.get('default', generated_goal.default)
+        generated_goal.__doc__ = your_goal_class.__doc__ or generated_goal.__doc__
 
 def before_option_groups_created(groups: dict[str, list[Type[Option[Any]]]]) -> dict[str, list[Type[Option[Any]]]]:
     return groups
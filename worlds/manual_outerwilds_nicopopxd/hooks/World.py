@@ -4,18 +4,18 @@ from worlds.generic.Rules import add_rule
 from ..Data import load_data_file
 from copy import copy
 
-from BaseClasses import MultiWorld, CollectionState
+from BaseClasses import MultiWorld, CollectionState, Item
 import logging
 
 # Object classes from Manual -- extending AP core -- representing items and locations that are used in generation
-from ..Items import ManualItem
-from ..Locations import ManualLocation
+from ..Items import ManualItem, item_table
+from ..Locations import ManualLocation, location_table
 from .Helpers import InitCategories
 
 # Raw JSON data from the Manual apworld, respectively:
 #          data/game.json, data/items.json, data/locations.json, data/regions.json
 #
-from ..Data import game_table, item_table, location_table, region_table
+from ..Data import game_table
 from .Options import EarlyShipKey, RandomContent, Goal
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
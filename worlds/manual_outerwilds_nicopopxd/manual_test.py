@@ -1,6 +1,687 @@
+import csv
+import importlib.resources
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import unittest
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from unittest import mock
+
+import Utils
 from test.TestBase import WorldTestBase
 from .Game import game_name
+from .Data import location_csv_columns, DataCache
+from .Helpers import data_bundle_name, parse_data_csv, get_items_for_player, pick_starting_items, get_forbidden_item_names, \
+    ItemCounts, format_state_prog_items_key, ProgItemsCat, HookRegistry, OptionArtifactCache
+from .Items import ManualItem
+from . import Helpers
+from BaseClasses import CollectionState, ItemClassification, Location
+from worlds.generic.Rules import forbid_items_for_player
+from .Locations import LocationRecord
+from .DataValidation import DataValidation, ValidationError, runGenerationDataValidation
+
+
+def assert_same_as_before(test: unittest.TestCase, seeds: Iterable[int], run_before: Callable[[random.Random], Any], run_now: Callable[[random.Random], Any]):
+    """For each seed, the result of run_now must be the same as the one of run_before (how it used to be done)
+    and they must leave their random.Random in the same state, so the seeds generate the same as before."""
+    for seed in seeds:
+        with test.subTest(seed=seed):
+            expected_rng, rng = random.Random(seed), random.Random(seed)
+            expected = run_before(expected_rng)
+            test.assertEqual(run_now(rng), expected)
+            test.assertEqual(rng.getstate(), expected_rng.getstate())
 
 
 class ManualTest(WorldTestBase):
     game = game_name
+
+    def test_player_item_index(self):
+        """get_items_for_player uses the player's item index, it must match going through every item of the multiworld"""
+        items = [item for item in self.multiworld.get_items() if item.player == self.player]
+        self.assertCountEqual(get_items_for_player(self.multiworld, self.player), items)
+
+    def test_stage_pre_fill_refreshes_player_item_index(self):
+        """Items added after create_items must be indexed once stage_pre_fill is done, an index still matching isn't rebuilt"""
+        world = self.multiworld.worlds[self.player]
+        index, tables = world.player_item_index, world.item_value_tables
+        type(world).stage_pre_fill(self.multiworld)
+        self.assertIs(world.player_item_index, index)
+        self.multiworld.push_precollected(world.create_item(world.get_filler_item_name()))
+        type(world).stage_pre_fill(self.multiworld)
+        self.assertIsNot(world.item_value_tables, tables, "The item value tables count the starting items too")
+        item = world.create_item(world.get_filler_item_name())
+        self.multiworld.itempool.append(item)
+        type(world).stage_pre_fill(self.multiworld)
+        items = [i for i in self.multiworld.get_items() if i.player == self.player]
+        self.assertIn(item, items)
+        self.assertCountEqual(get_items_for_player(self.multiworld, self.player), items)
+
+    def test_prefill_reports_unreachable_locations(self):
+        """A location requiring an item that isn't in the pool must be reported by pre_fill with what blocks it"""
+        world = self.multiworld.worlds[self.player]
+        location = next(location for location in self.multiworld.get_locations(self.player)
+                        if location.address is not None and location.name in world.location_name_to_location)
+        broken_location = {**world.location_name_to_location[location.name], "requires": "|Missing Item|"}
+        old_rule = location.access_rule
+        location.access_rule = lambda state: state.has("Missing Item", self.player)
+        try:
+            with mock.patch.dict(world.location_name_to_location, {location.name: broken_location}):
+                with self.assertRaises(ValidationError) as context:
+                    DataValidation.preFillCheckForUnreachableLocations(world, self.multiworld)
+        finally:
+            location.access_rule = old_rule
+        self.assertEqual(str(context.exception),
+                         "The following location(s) cannot be reached even with every progression item collected: \n"
+                         f"   '{location.name}' in region '{location.parent_region.name}': blocked by |Missing Item|")
+
+    def test_deprecated_item_value_resets(self):
+        """The deprecated resets warn once, only rebuild the index when it's used next and ignore worlds that aren't Manual"""
+        world = self.multiworld.worlds[self.player]
+        index = world.player_item_index
+        with mock.patch.object(Helpers, "_deprecations_warned", set()), self.assertLogs(level="WARNING") as logs:
+            for _ in range(3):
+                Helpers.reset_item_value_cache_for_player(world)
+            self.assertIs(world.player_item_index, index, "The index must not be rebuilt before it's used")
+            self.assertCountEqual(get_items_for_player(self.multiworld, self.player), index.items)
+            self.assertIsNot(world.player_item_index, index)
+            other_world = types.SimpleNamespace(multiworld=self.multiworld, player=self.player + 1)
+            with mock.patch.dict(self.multiworld.worlds, {other_world.player: other_world}):
+                self.assertEqual(Helpers.reset_specific_item_value_cache_for_player(world, "coins", other_world.player), {})
+        self.assertEqual(len(logs.records), 2, "Each deprecated function must only warn once")
+
+    @staticmethod
+    def trim_one_by_one(item_pool: list, extras: int, rng: random.Random):
+        """How adjust_filler_items used to remove the extra items, one item_pool.remove at a time"""
+        fillers = [item for item in item_pool if item.classification == ItemClassification.filler]
+        traps = [item for item in item_pool if item.classification == ItemClassification.trap]
+        useful = [item for item in item_pool if item.classification == ItemClassification.useful]
+        useful_traps = [item for item in item_pool if item.classification == ItemClassification.useful | ItemClassification.trap]
+        for items in (fillers, traps, useful, useful_traps):
+            rng.shuffle(items)
+        for _ in range(extras):
+            items = next((items for items in (fillers, traps, useful, useful_traps) if items), None)
+            if items is None:
+                break
+            item_pool.remove(items.pop())
+
+    def test_adjust_filler_items_trimming(self):
+        """Trimming an oversized pool must remove the same items and use the random state like removing them one by one did"""
+        world = self.multiworld.worlds[self.player]
+        location_count = len(self.multiworld.get_unfilled_locations(player=self.player))
+        classifications = [ItemClassification.filler, ItemClassification.trap, ItemClassification.useful,
+                           ItemClassification.useful | ItemClassification.trap, ItemClassification.progression]
+        for extras in (40, location_count * 2):
+            # names shared between classifications so removing the first equal item matters
+            make_pool = lambda: [ManualItem(f"Item {i % 7}", classifications[i % 5], i, player=self.player) for i in range(location_count + extras)]
+
+            def trim_before(rng: random.Random):
+                pool = make_pool()
+                self.trim_one_by_one(pool, extras, rng)
+                return [(i.name, i.classification) for i in pool]
+
+            def trim_now(rng: random.Random):
+                world.random = rng
+                pool = make_pool()
+                counts = ItemCounts(pool)
+                world.adjust_filler_items(pool, [], counts)
+                self.assertEqual(counts, ItemCounts(pool), "The item counts kept up to date must match a recount")
+                return [(i.name, i.classification) for i in pool]
+
+            with self.subTest(extras=extras):
+                assert_same_as_before(self, range(10), trim_before, trim_now)
+
+    @staticmethod
+    def place_one_by_one(item_pool: list, locations: list[Location], candidates: dict, player: int, rng: random.Random):
+        """How place_items_at_locations used to place the items, scanning the pool and calling item_pool.remove for each location"""
+        for location in locations:
+            eligible_item_names = candidates[location.name][0]
+            eligible_items = [item for item in item_pool if item.player == player and item.name in eligible_item_names]
+            item_to_place = rng.choice(eligible_items)
+            location.place_locked_item(item_to_place)
+            item_pool.remove(item_to_place)
+
+    def test_place_items_at_locations(self):
+        """Placing from the indexed pool must place the same items, leave the same pool and use the random state like before"""
+        world = self.multiworld.worlds[self.player]
+        other_player = self.player + 1
+        candidates = {f"Location {i}": (frozenset(f"Item {j}" for j in range(i % 4, i % 4 + 3)), f"No item for Location {i}") for i in range(12)}
+        # names shared between players and repeated in the pool so removing the first equal item matters
+        make_pool = lambda: [ManualItem(f"Item {i % 7}", ItemClassification.progression, i, player=(self.player, other_player)[i % 3 == 0])
+                             for i in range(60)]
+        make_locations = lambda: [Location(self.player, name) for name in candidates]
+
+        def place_before(rng: random.Random):
+            pool, locations = make_pool(), make_locations()
+            self.place_one_by_one(pool, locations, candidates, self.player, rng)
+            return [l.item.code for l in locations], [i.code for i in pool]
+
+        def place_now(rng: random.Random):
+            world.random = rng
+            pool, locations = make_pool(), make_locations()
+            with mock.patch.object(self.multiworld, "itempool", pool), \
+                    mock.patch.object(world, "get_location_placement_candidates", return_value=candidates):
+                world.place_items_at_locations(locations)
+            return [l.item.code for l in locations], [i.code for i in pool]
+
+        assert_same_as_before(self, range(10), place_before, place_now)
+
+        location = Location(self.player, "Location 0")
+        with mock.patch.object(self.multiworld, "itempool", []), \
+                mock.patch.object(world, "get_location_placement_candidates", return_value=candidates), \
+                self.assertRaisesRegex(Exception, "No item for Location 0"):
+            world.place_items_at_locations([location])
+
+    def test_create_items_bulk(self):
+        """create_items_bulk must create the same items as calling create_item for every copy"""
+        world = self.multiworld.worlds[self.player]
+        for name in world.item_name_to_item:
+            expected = [world.create_item(name) for _ in range(3)]
+            created = world.create_items_bulk(name, 3)
+            self.assertEqual([(i.name, i.classification, i.code, i.player) for i in created],
+                             [(i.name, i.classification, i.code, i.player) for i in expected])
+
+    def test_collect_remove(self):
+        """Collecting then removing every item of the player must add then remove all their values, report how fast it goes"""
+        world = self.multiworld.worlds[self.player]
+        items = get_items_for_player(self.multiworld, self.player)
+        state = CollectionState(self.multiworld)
+        initial = dict(state.prog_items[self.player])
+        rounds = 20
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for item in items:
+                world.collect(state, item)
+            collected = dict(state.prog_items[self.player])
+            for item in items:
+                world.remove(state, item)
+        elapsed = time.perf_counter() - start
+        logging.info(f"collect/remove of {len(items)} items: {rounds * len(items) * 2 / elapsed:.0f} ops/s")
+        for value, total in world.item_value_tables.progression_totals.items():
+            self.assertEqual(collected.get(format_state_prog_items_key(ProgItemsCat.VALUE, value), 0), total)
+        self.assertEqual({key: count for key, count in state.prog_items[self.player].items() if count},
+                         {key: count for key, count in initial.items() if count})
+
+def import_apworld_in_new_process(code: str = "") -> tuple[int, str]:
+    """Import this apworld in a fresh interpreter with -X importtime, run 'code' after it and
+    return the cumulative import time of the apworld in microseconds along with the stdout of 'code'"""
+    package = __name__.rsplit(".", 1)[0]
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import sys, {package}\n{code}"],
+                            capture_output=True, text=True, cwd=Utils.local_path())
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {package} failed:\n{result.stderr}")
+
+    # each line looks like: "import time:      self [us] |  cumulative | imported package"
+    for line in result.stderr.splitlines():
+        columns = line.split("|")
+        if len(columns) == 3 and columns[2].strip() == package:
+            return int(columns[1]), result.stdout
+    raise RuntimeError(f"Could not find {package} in the -X importtime output")
+
+
+class ManualStartingItemsTest(unittest.TestCase):
+    item_name_to_item = {f"Item {i}": {"name": f"Item {i}", "category": [f"Category {i % 4}"]} for i in range(12)}
+    blocks = [
+        {"items": ["Item 1", "Item 2"]},
+        {"items": ["Item 3", "Item 5", "Item 7"], "random": 2},
+        {"item_categories": ["Category 1"], "random": 3},
+        {"item_categories": ["Category 2", "Category 3"]},
+        {"random": 5},
+        {}, # takes every other item of the pool
+    ]
+
+    @staticmethod
+    def pick_one_by_one(pool: list, starting_item_block: dict, rng: random.Random, item_name_to_item: dict) -> list:
+        """How create_items used to pick the starting items, one list lookup and pool.remove at a time"""
+        items = pool
+        if "items" in starting_item_block:
+            items = [item for item in pool if item.name in starting_item_block["items"]]
+        if "item_categories" in starting_item_block:
+            items_in_categories = [item["name"] for item in item_name_to_item.values()
+                                   if set(item["category"]) & set(starting_item_block["item_categories"])]
+            items = [item for item in pool if item.name in items_in_categories]
+        rng.shuffle(items)
+        if "random" in starting_item_block:
+            items = items[0:starting_item_block["random"]]
+        picked = []
+        for starting_item in items:
+            picked.append(starting_item)
+            pool.remove(starting_item)
+        return picked
+
+    def make_pool(self) -> list:
+        # copies of the same item with different classifications, to tell which copy got removed from the pool
+        return [ManualItem(f"Item {i % 12}", ItemClassification(i // 12 % 2), i % 12, player=1) for i in range(60)]
+
+    def test_same_picks_for_fixed_seeds(self):
+        """The starting items, the remaining pool and the random state must be the same as picking them one by one"""
+        for block in self.blocks:
+            def pick_before(rng: random.Random):
+                pool = self.make_pool()
+                picked = self.pick_one_by_one(pool, block, rng, self.item_name_to_item)
+                return [(i.name, i.classification) for i in picked], [(i.name, i.classification) for i in pool]
+
+            def pick_now(rng: random.Random):
+                pool = self.make_pool()
+                counts = ItemCounts(pool)
+                picked = pick_starting_items(pool, block, rng, self.item_name_to_item, counts)
+                self.assertEqual(counts, ItemCounts(pool + picked), "The counts of the pool and starting items must match a recount")
+                return [(i.name, i.classification) for i in picked], [(i.name, i.classification) for i in pool]
+
+            with self.subTest(block=block):
+                assert_same_as_before(self, range(20), pick_before, pick_now)
+
+
+class ManualHookRegistryTest(unittest.TestCase):
+    def test_trivial_hooks(self):
+        """Only hooks doing nothing or returning their first argument can be skipped, whatever their arguments are called"""
+        hooks = types.ModuleType("hooks_module")
+        exec(
+            "def before_nothing(world, multiworld, player):\n    pass\n"
+            "def after_documented(world, state, changed, item):\n    \"\"\"Does nothing\"\"\"\n"
+            "def before_passthrough(item_pool, world, multiworld, player):\n    return item_pool\n"
+            "def hook_returns_false(world, multiworld, player):\n    return False\n"
+            "def after_returns_world(item_pool, world, multiworld, player):\n    return world\n"
+            "def after_changes(slot_data, world, multiworld, player):\n    slot_data['a'] = 1\n    return slot_data\n"
+            "def not_a_hook():\n    pass\n",
+            vars(hooks))
+        registry = HookRegistry(hooks)
+        self.assertEqual(set(registry.hooks), {"before_nothing", "after_documented", "before_passthrough", "hook_returns_false",
+                                               "after_returns_world", "after_changes"})
+        self.assertEqual(registry.trivial, {"before_nothing", "after_documented", "before_passthrough"})
+        self.assertTrue(registry.is_active("before_unknown"))
+        logging.info(registry.report())
+
+
+run_benchmarks = bool(os.environ.get("MANUAL_RUN_BENCHMARKS"))
+"""The benchmarks below only log their timings and are slow, they're skipped unless MANUAL_RUN_BENCHMARKS is set"""
+benchmark = unittest.skipUnless(run_benchmarks, "Set MANUAL_RUN_BENCHMARKS to run the benchmarks")
+
+
+class ManualOptionArtifactCacheTest(unittest.TestCase):
+    def test_least_recently_used_is_dropped(self):
+        cache = OptionArtifactCache(maxsize=2)
+        builds = []
+        build = lambda key: lambda: builds.append(key) or key
+        for key in ("a", "b", "a", "c", "b", "a"):
+            self.assertEqual(cache.get("artifact", key, build(key)), key)
+        # "b" was dropped when "c" was added since "a" was used after it, then "b" dropped "a"
+        self.assertEqual(builds, ["a", "b", "c", "b", "a"])
+        self.assertEqual((cache.hits, cache.misses), (1, 5))
+        self.assertEqual(len(cache.artifacts), 2)
+
+    def test_players_with_same_options_share_artifacts(self):
+        """Slots with the same options must get the same regions and items while only building them once,
+        unless the item or location enabled hooks were changed from the template"""
+        from test.general import setup_multiworld
+        from . import ManualWorld
+
+        for share in (True, False):
+            with self.subTest(share=share), mock.patch.object(ManualWorld, "share_option_artifacts", share), \
+                    mock.patch.object(ManualWorld, "option_artifacts", OptionArtifactCache()):
+                multiworld = setup_multiworld([ManualWorld] * 3, seed=0)
+                self.assertEqual(ManualWorld.option_artifacts.misses, 2 if share else 0, "The enabled locations and item config must be built once")
+                self.assertEqual(ManualWorld.option_artifacts.hits, 4 if share else 0)
+                location_names = [sorted(location.name for location in multiworld.get_locations(player)) for player in multiworld.player_ids]
+                self.assertTrue(all(names == location_names[0] for names in location_names))
+
+
+@benchmark
+@unittest.skipIf(getattr(sys, "frozen", False), "Needs a python interpreter to import the apworld in")
+class ManualImportBenchmark(unittest.TestCase):
+    def test_import_time(self):
+        """Report how long importing the apworld takes and which data tables had to be loaded for it"""
+        package = __name__.rsplit(".", 1)[0]
+        cumulative, loaded_tables = import_apworld_in_new_process(
+            f"print(','.join(name for name in sys.modules['{package}.Data']._table_loaders if name in vars(sys.modules['{package}.Data'])))")
+        logging.info(f"{game_name} import took {cumulative / 1000:.1f}ms, data tables loaded at import: {loaded_tables.strip()}")
+
+
+@unittest.skipIf(getattr(sys, "frozen", False), "Needs a python interpreter to import the apworld in")
+class ManualClientImportTest(unittest.TestCase):
+    client_heavy_modules = ["CommonClient", "MultiServer", "requests", "kvui"]
+    """Modules that only the client needs, importing ManualClient must not import them"""
+
+    def test_client_import_is_light(self):
+        """ManualClient is imported by the launcher before the client runs, the client's own imports should wait until it does"""
+        package = __name__.rsplit(".", 1)[0]
+        _, imported = import_apworld_in_new_process(
+            f"before = set(sys.modules)\n"
+            f"import {package}.ManualClient\n"
+            f"print(','.join(m for m in {self.client_heavy_modules!r} if m in sys.modules and m not in before))")
+        self.assertEqual(imported.strip(), "", f"Importing ManualClient also imported: {imported.strip()}")
+
+
+class ManualCsvTest(unittest.TestCase):
+    def test_requires_strings_like_json(self):
+        """Requires strings starting with a {function()} or a [region] aren't json and must be kept as written"""
+        csv_text = ('name,category,requires\n'
+                    '"Loc 1",Cat,"{OptOne(|Item A|)} and |Item B|"\n'
+                    '"Loc 2","[Odd], Cat","[5 - Get to the Vessel] and |Item A|"\n'
+                    '"Loc 3","[""Cat""]","[""Item A"", ""Item B:2""]"\n')
+        locations = list(parse_data_csv(io.StringIO(csv_text, newline=""), location_csv_columns))
+        self.assertEqual([(loc["category"], loc["requires"]) for loc in locations], [
+            (["Cat"], "{OptOne(|Item A|)} and |Item B|"),
+            (["[Odd]", "Cat"], "[5 - Get to the Vessel] and |Item A|"),
+            (["Cat"], ["Item A", "Item B:2"]),
+        ])
+
+
+class ManualDataLoadingTest(unittest.TestCase):
+    def test_json_errors_reported_together(self):
+        """The json errors of the tables loaded on first access must all be displayed at once, and only once"""
+        from . import Data
+        checks = [mock.Mock(side_effect=ValidationError(f"Table {i} is invalid")) for i in range(2)]
+        with mock.patch.object(Data, "_json_validation_errors", []), mock.patch.object(Data, "_json_validation_errors_reported", 0), \
+                mock.patch.object(Data, "is_validation_cached", return_value=False), \
+                mock.patch("builtins.input") as prompt, mock.patch("builtins.print"):
+            for check in checks:
+                Data._validate_json(check)
+            with self.assertLogs(level="ERROR") as logs:
+                self.assertTrue(Data.report_json_validation_errors())
+            self.assertTrue(Data.report_json_validation_errors(), "The errors are still there for the generation validation")
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("Table 0 is invalid", logs.output[0])
+        self.assertIn("Table 1 is invalid", logs.output[0])
+        prompt.assert_called_once()
+
+
+    def test_outdated_bundle_ignored(self):
+        """Json files edited after the bundle was built must be loaded instead of it, with a warning"""
+        with tempfile.TemporaryDirectory() as folder:
+            data_folder = Path(folder) / "data"
+            data_folder.mkdir()
+            (data_folder / data_bundle_name).write_bytes(b"bundle")
+            (data_folder / "items.json").write_text("[]")
+            with mock.patch.object(Helpers, "__file__", str(Path(folder) / "Helpers.py")), mock.patch.object(Helpers, "_data_bundle", None):
+                os.utime(data_folder / data_bundle_name, (1000, 1000))
+                os.utime(data_folder / "items.json", (0, 0))
+                self.assertFalse(Helpers.is_data_bundle_outdated())
+                os.utime(data_folder / "items.json", (2000, 2000))
+                self.assertTrue(Helpers.is_data_bundle_outdated())
+                with self.assertLogs(level="WARNING"):
+                    self.assertEqual(Helpers.load_data_bundle(), {})
+
+    def test_after_load_hooks_order(self):
+        """Whichever table is accessed first, the active after_load_* hooks must run in the order they did when every table was loaded at import"""
+        from . import Data
+        active = {"after_load_game_file", "after_load_item_file", "after_load_region_file"}
+        expected_calls = {
+            "game_table": ["game"],
+            "item_table": ["game", "item", "location"],
+            "location_table": ["game", "item", "location"],
+            "region_table": ["game", "item", "location", "region"],
+            "category_table": ["game", "item", "location", "region", "category"],
+            "option_table": ["game", "item", "location", "region", "option"],
+            "meta_table": ["game", "item", "location", "region", "meta"],
+        }
+        for first_table, expected in expected_calls.items():
+            with self.subTest(first=first_table):
+                calls = []
+                def make_hook(table_name: str):
+                    def hook(table):
+                        calls.append(table_name)
+                        if table_name == "item":
+                            Data.location_table # A hook reading a later table loads it, once
+                        return table
+                    return hook
+                hooks = {f"after_load_{name}_file": make_hook(name) for name in ("game", "item", "location", "region", "category", "option", "meta")}
+                with mock.patch.dict(Data.__dict__, hooks), \
+                        mock.patch.object(Data.data_hooks, "is_active", lambda name: name in active), \
+                        mock.patch.multiple(DataValidation, game_table={}, item_table=[], location_table=[], region_table={}), \
+                        mock.patch.object(Data, "_json_validation_errors", []):
+                    for name in expected_calls:
+                        Data.__dict__.pop(name, None)
+                    getattr(Data, first_table)
+                self.assertEqual(calls, expected)
+
+
+class ManualDataCacheTest(unittest.TestCase):
+    def test_key_changes_with_csv_next_to_a_bundle(self):
+        """The bundle only replaces the json files, editing a csv file next to it must still change the cache key"""
+        package_folder = Path(__file__).parent
+        old_key = DataCache._key
+        keys = []
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                package = Path(folder)
+                (package / "data").mkdir()
+                for filename in DataCache.source_files:
+                    shutil.copy(package_folder / filename, package / filename)
+                (package / "data" / data_bundle_name).write_bytes(b"bundle")
+                for items_csv in ("name\nItem A\n", "name\nItem B\n"):
+                    (package / "data" / "items.csv").write_text(items_csv)
+                    DataCache._key = None
+                    with mock.patch.object(importlib.resources, "files", return_value=package):
+                        keys.append(DataCache.get_key())
+        finally:
+            DataCache._key = old_key
+        self.assertNotEqual(keys[0], keys[1])
+
+    def test_cache_skipped_with_changed_hook(self):
+        """A cache hit skips the table's after_load hook, so the cache must only be used while that hook is left as in the template"""
+        from . import Data
+        cache = DataCache("hooked", "after_load_item_file")
+        with tempfile.TemporaryDirectory() as folder, mock.patch.object(cache, "path", os.path.join(folder, "hooked.pickle")):
+            for hook_active in (True, False):
+                with self.subTest(hook_active=hook_active), \
+                        mock.patch.object(Data.data_hooks, "is_active", lambda name: hook_active and name == "after_load_item_file"):
+                    cache.save({"items": [1, 2]})
+                    self.assertEqual(cache.load(), None if hook_active else {"items": [1, 2]})
+
+    def test_validation_cache(self):
+        """Validation must run once for these data files and hooks, then be skipped unless forced, uncached or the files change"""
+        from . import Data
+        world = type("CacheTestWorld", (), {"game": game_name})
+        check = mock.Mock(wraps=DataValidation.checkForDuplicateItemNames)
+
+        def validate(**kwargs) -> int:
+            Data._validation_cached = None # As if it was a new generation
+            check.reset_mock()
+            runGenerationDataValidation(world, **kwargs)
+            return check.call_count
+
+        old_key = DataCache._key
+        try:
+            with tempfile.TemporaryDirectory() as folder, \
+                    mock.patch.object(Data.validation_cache, "path", os.path.join(folder, "validation.pickle")), \
+                    mock.patch.object(Data, "_validation_cached", None), \
+                    mock.patch.object(DataValidation, "checkForDuplicateItemNames", check):
+                self.assertEqual(validate(), 1, "Nothing cached yet, it must validate")
+                self.assertEqual(validate(), 0, "It already passed, it must be skipped")
+                self.assertEqual(validate(use_cache=False), 1, "use_cache=False must always validate")
+                with mock.patch.object(DataValidation, "force_validation", True):
+                    self.assertEqual(validate(), 1, "MANUAL_FORCE_VALIDATION must always validate")
+                DataCache._key = "other data files"
+                self.assertEqual(validate(), 1, "Changed data files must be validated again")
+        finally:
+            DataCache._key = old_key
+
+
+class ManualValidationTest(unittest.TestCase):
+    def test_in_place_edits_validated(self):
+        """Renaming an item in place, like a hook can, must be seen by the next validation"""
+        items = [{"name": "Key", "category": ["Keys"], "progression": True}]
+        locations = [{"name": "Chest", "region": "Menu", "requires": "|Key|"}]
+        regions = {"Menu": {"starting": True, "connects_to": []}}
+        world = type("ValidationTestWorld", (), {"game": "Test"})
+        with mock.patch.multiple(DataValidation, game_table={"game": "Test"}, item_table=items, location_table=locations, region_table=regions):
+            runGenerationDataValidation(world, use_cache=False)
+            DataValidation.checkItemNamesInLocationRequires()
+            items[0]["name"] = "Lock"
+            with self.assertRaisesRegex(ValidationError, "Key"):
+                DataValidation.checkItemNamesInLocationRequires()
+            with self.assertRaisesRegex(Exception, "Key"):
+                runGenerationDataValidation(world, use_cache=False)
+
+
+@benchmark
+class ManualCsvBenchmark(unittest.TestCase):
+    location_count: int = 20000
+
+    def make_locations(self) -> list[dict]:
+        return [{"name": f"Location {i}", "region": f"Region {i % 50}", "category": [f"Category {i % 20}", "Bulk"],
+                 "requires": f"|Item {i % 100}| and |@Category {i % 7}:2|", "victory": i == self.location_count - 1}
+                for i in range(self.location_count)]
+
+    def test_csv_against_json(self):
+        """Compare loading a large locations table from csv (row by row) and from json, both must give the same table"""
+        locations = self.make_locations()
+        json_text = json.dumps(locations)
+        csv_file = io.StringIO(newline="")
+        writer = csv.writer(csv_file)
+        writer.writerow(["name", "region", "category", "requires", "victory"])
+        writer.writerows([loc["name"], loc["region"], ",".join(loc["category"]), loc["requires"], loc["victory"]] for loc in locations)
+        csv_text = csv_file.getvalue()
+
+        def measure(load):
+            tracemalloc.start()
+            start = time.perf_counter()
+            table = load()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return table, elapsed, peak
+
+        json_table, json_time, json_peak = measure(lambda: json.loads(json_text))
+        csv_table, csv_time, csv_peak = measure(lambda: list(parse_data_csv(io.StringIO(csv_text, newline=""), location_csv_columns)))
+        logging.info(f"{self.location_count} locations: json took {json_time * 1000:.1f}ms (peak {json_peak / 1024:.0f}KiB), "
+                     f"csv took {csv_time * 1000:.1f}ms (peak {csv_peak / 1024:.0f}KiB)")
+        self.assertEqual(csv_table, json_table)
+
+
+@benchmark
+class ManualRecordMemoryBenchmark(unittest.TestCase):
+    def test_records_against_dicts(self):
+        """Compare the memory used by a large locations table as dicts and as the records the tables are kept as"""
+        locations = ManualCsvBenchmark().make_locations()
+
+        def measure(make):
+            tracemalloc.start()
+            table = make()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return table, size
+
+        dict_table, dict_size = measure(lambda: [dict(loc, category=list(loc["category"])) for loc in locations])
+        record_table, record_size = measure(lambda: [LocationRecord(loc) for loc in locations])
+        logging.info(f"{len(locations)} locations: dicts use {dict_size / 1024:.0f}KiB, records use {record_size / 1024:.0f}KiB")
+        self.assertEqual([dict(record) for record in record_table], [dict(loc, category=tuple(loc["category"])) for loc in dict_table])
+        self.assertLess(record_size, dict_size)
+
+
+@benchmark
+class ManualValidationBenchmark(unittest.TestCase):
+    item_count: int = 10000
+    location_count: int = 20000
+    region_count: int = 200
+
+    def make_tables(self) -> tuple[dict, list, list, dict]:
+        # Only the first half of the items are progression and required by something
+        required_count = self.item_count // 2
+        items = [{"name": f"Item {i}", "category": [f"Category {i % 50}"], "progression": i < required_count} for i in range(self.item_count)]
+        locations = [{"name": f"Location {i}", "region": f"Region {i % self.region_count}", "category": ["Bulk"],
+                      "requires": f"|Item {i % required_count}| and |@Category {i % 50}:2|", "place_item_category": [f"Category {i % 50}"]}
+                     for i in range(self.location_count)]
+        regions = {f"Region {i}": {"starting": i == 0, "connects_to": [f"Region {i + 1}"] if i + 1 < self.region_count else [],
+                                   "requires": f"|Item {i}|"}
+                   for i in range(self.region_count)}
+        game = {"game": "Benchmark", "starting_items": [{"items": ["Item 0"]}, {"item_categories": ["Category 1"], "random": 1}]}
+        return game, items, locations, regions
+
+    def test_generation_validation_time(self):
+        """Report how long validating a large synthetic manual takes"""
+        from .Data import region_table # Loaded first so it doesn't replace the synthetic tables below when loading
+        game, items, locations, regions = self.make_tables()
+        original_tables = (DataValidation.game_table, DataValidation.item_table, DataValidation.location_table, DataValidation.region_table)
+        try:
+            DataValidation.game_table, DataValidation.item_table, DataValidation.location_table, DataValidation.region_table = game, items, locations, regions
+            start = time.perf_counter()
+            runGenerationDataValidation(type("BenchmarkWorld", (), {"game": "Benchmark"}), use_cache=False)
+            elapsed = time.perf_counter() - start
+        finally:
+            DataValidation.game_table, DataValidation.item_table, DataValidation.location_table, DataValidation.region_table = original_tables
+        logging.info(f"Validating {self.item_count} items, {self.location_count} locations and {self.region_count} regions took {elapsed * 1000:.1f}ms")
+
+
+@benchmark
+class ManualForbidRuleBenchmark(unittest.TestCase):
+    """Modeled after PlateUp's token goals: every goal location forbids the Victory and Chaos tokens and the pool is mostly tokens"""
+    item_count: int = 500
+    location_count: int = 2000
+    candidates_per_location: int = 100
+
+    def make_data(self) -> tuple[dict, list, list]:
+        item_name_to_item = {f"Item {i}": {"name": f"Item {i}", "category": [f"Category {i % 20}"]} for i in range(self.item_count)}
+        for token in ("Victory Token", "Chaos Token"):
+            item_name_to_item[token] = {"name": token, "category": ["Tokens"]}
+        locations = [{"name": f"Location {i}", "dont_place_item": ["Victory Token", "Chaos Token"], "dont_place_item_category": [f"Category {i % 20}"]}
+                     for i in range(self.location_count)]
+        candidates = [ManualItem("Victory Token" if i % 4 else f"Item {i}", ItemClassification.progression, i, player=1)
+                      for i in range(self.candidates_per_location)]
+        return item_name_to_item, locations, candidates
+
+    def forbid_and_check(self, forbid) -> tuple[float, int]:
+        """Install the forbid rules on fresh locations then check every candidate item at every location like fill would"""
+        item_name_to_item, locations, candidates = self.make_data()
+        rule_locations = [Location(1, location["name"]) for location in locations]
+        start = time.perf_counter()
+        forbid(locations, item_name_to_item, rule_locations)
+        allowed = sum(1 for location in rule_locations for item in candidates if location.item_rule(item))
+        return time.perf_counter() - start, allowed
+
+    @staticmethod
+    def forbid_per_location(locations: list, item_name_to_item: dict, rule_locations: list):
+        """How generate_basic used to do it, going through every item for each location"""
+        for location, manual_location in zip(rule_locations, locations):
+            forbidden_item_names = [i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]]
+            forbidden_item_names.extend(i["name"] for i in item_name_to_item.values()
+                                        if set(i["category"]).intersection(manual_location["dont_place_item_category"]))
+            forbid_items_for_player(location, set(forbidden_item_names), 1)
+
+    @staticmethod
+    def forbid_precomputed(locations: list, item_name_to_item: dict, rule_locations: list):
+        forbidden_item_names = get_forbidden_item_names(locations, item_name_to_item)
+        for location in rule_locations:
+            forbid_items_for_player(location, forbidden_item_names[location.name], 1)
+
+    def test_forbid_rules_time(self):
+        old_elapsed, old_allowed = self.forbid_and_check(self.forbid_per_location)
+        elapsed, allowed = self.forbid_and_check(self.forbid_precomputed)
+        logging.info(f"Forbidding and checking {self.candidates_per_location} items at {self.location_count} locations took "
+                     f"{elapsed * 1000:.1f}ms, it took {old_elapsed * 1000:.1f}ms going through every item per location")
+        self.assertEqual(allowed, old_allowed)
+
+
+@benchmark
+class ManualSlotScalingBenchmark(unittest.TestCase):
+    slot_counts: tuple[int, ...] = (1, 10, 50)
+
+    def test_generation_per_slot(self):
+        """Report how long generating takes per slot as slots of this game are added, what only depends on the data must be built once for all of them"""
+        from test.general import setup_multiworld
+        from . import ManualWorld
+
+        shared = None
+        for slots in self.slot_counts:
+            start = time.perf_counter()
+            multiworld = setup_multiworld([ManualWorld] * slots, seed=0)
+            elapsed = time.perf_counter() - start
+            logging.info(f"{slots} {game_name} slot(s) took {elapsed * 1000:.0f}ms to generate, {elapsed * 1000 / slots:.1f}ms per slot")
+
+            world = multiworld.worlds[multiworld.player_ids[-1]]
+            built = (world.get_location_forbidden_item_names(), world.get_location_placement_candidates(),
+                     world.get_category_item_names(), world.get_parsed_requires())
+            if shared is not None:
+                for artifact, previous in zip(built, shared):
+                    self.assertIs(artifact, previous, "Data only artifacts must not be rebuilt for new slots")
+            shared = built